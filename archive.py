@@ -0,0 +1,248 @@
+"""
+    Name        : Raw Archive
+    Date        : 18-10-2026
+    Description : Append-only, per record compressed archive of the raw responses of a crawl.
+"""
+
+
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from paths import make_parent
+
+
+# first bytes of every record, followed by the metadata and body sizes
+MAGIC = b'RAW1'
+
+# tab name of the game page itself
+PAGE = 'game'
+
+# response headers stored with the body
+KEEP_HEADERS = ('Content-Type', 'Content-Encoding', 'ETag', 'Last-Modified', 'Date')
+
+
+class ArchiveRecord:
+    """One archived response: the original body bytes and how it was fetched."""
+
+    def __init__(self, game_url, tab, url, status_code, headers, fetched_at, content):
+        self.game_url = game_url
+        self.tab = tab
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.fetched_at = fetched_at
+        self.content = content
+
+
+def _encode(record):
+    meta = json.dumps({
+        'game_url': record.game_url,
+        'tab': record.tab,
+        'url': record.url,
+        'status_code': record.status_code,
+        'headers': record.headers,
+        'fetched_at': record.fetched_at,
+    }).encode('utf-8')
+    body = zlib.compress(record.content)
+    header = MAGIC + b' %d %d\n' % (len(meta), len(body))
+    return header + meta + body + b'\n'
+
+
+def _decode(data, offset=0):
+    """Record at offset of data (bytes or mmap), with the offset after it."""
+    end = data.find(b'\n', offset)
+    if end < 0 or data[offset:offset + len(MAGIC)] != MAGIC:
+        raise ValueError(f"no archive record at offset {offset}")
+    meta_size, body_size = map(int, data[offset + len(MAGIC):end].split())
+    start = end + 1
+    meta = json.loads(bytes(data[start:start + meta_size]).decode('utf-8'))
+    start += meta_size
+    content = zlib.decompress(data[start:start + body_size])
+    return ArchiveRecord(content=content, **meta), start + body_size + 1
+
+
+class RawArchive:
+    """Raw responses of a crawl in one append-only file.
+
+    Every record is the original response body (zlib compressed on its
+    own), its status code, headers and fetch time, WARC style. A SQLite
+    index next to the data file (`<path>.idx`) maps (game url, tab) to the
+    offset and length of the latest record, reading a record is one slice
+    of the memory mapped file. Records are appended and never rewritten,
+    a record whose index row was not committed (the crawl died in between)
+    is cut off the next time the archive is opened. The index can be
+    rebuilt from the data file alone with rebuild_index().
+
+    Safe to append to from many threads of one process. Open it `readonly`
+    to read an archive another process may be appending to.
+    """
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        make_parent(path)
+
+        self.lock = threading.RLock()
+        self.map = None
+        self.db = sqlite3.connect(path + '.idx', check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                game_url TEXT NOT NULL,
+                tab TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (game_url, tab)
+            )""")
+        self.db.commit()
+
+        if readonly:
+            self.fh = None
+        else:
+            self.fh = open(path, 'ab')
+            self._truncate_uncommitted()
+
+    def _indexed_end(self):
+        return self._query("SELECT MAX(offset + length) FROM records")[0][0] or 0
+
+    # drop bytes appended after the last indexed record
+    def _truncate_uncommitted(self):
+        end = self._indexed_end()
+        if end == 0 and self.fh.tell() > 0:
+            # records without an index, the .idx file was lost
+            self.rebuild_index()
+            end = self._indexed_end()
+        if self.fh.tell() > end:
+            self.fh.truncate(end)
+            self.fh.seek(end)
+
+    def append(self, game_url, tab, content, url=None, status_code=200,
+               headers=None, fetched_at=None):
+        headers = {name: headers[name] for name in KEEP_HEADERS
+                   if headers and name in headers}
+        record = ArchiveRecord(game_url, tab, url or game_url, status_code, headers,
+                               fetched_at or time.time(), content)
+        if self.readonly:
+            raise IOError(f"{self.path} is open read only")
+        data = _encode(record)
+        with self.lock:
+            offset = self.fh.tell()
+            self.fh.write(data)
+            self.fh.flush()
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO records (game_url, tab, offset, length, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (game_url, tab, offset, len(data), record.fetched_at))
+        return offset
+
+    # archive a requests response, answers from the cache are already
+    # archived unless the archive is missing the tab
+    def append_response(self, game_url, tab, response):
+        if getattr(response, 'from_cache', False) and self.has(game_url, tab):
+            return None
+        return self.append(game_url, tab, response.content, url=response.url,
+                           status_code=response.status_code, headers=response.headers)
+
+    # index lookups, the connection is shared by the appending threads
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def has(self, game_url, tab):
+        return bool(self._query(
+            "SELECT 1 FROM records WHERE game_url = ? AND tab = ?", (game_url, tab)))
+
+    def _flush(self):
+        if self.fh is not None:
+            self.fh.flush()
+
+    # the data file mapped at least up to `end`, remapped as it grows
+    def _mapped(self, end):
+        with self.lock:
+            if self.map is None or len(self.map) < end:
+                self._flush()
+                if self.map is not None:
+                    self.map.close()
+                with open(self.path, 'rb') as fh:
+                    self.map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            return self.map
+
+    def get(self, game_url, tab=PAGE):
+        """Latest record of a tab of a game, None when it isn't archived."""
+        rows = self._query(
+            "SELECT offset, length FROM records WHERE game_url = ? AND tab = ?",
+            (game_url, tab))
+        if not rows:
+            return None
+        offset, length = rows[0]
+        return _decode(self._mapped(offset + length), offset)[0]
+
+    # game urls in the order they were archived, by their first record
+    def games(self):
+        return [row[0] for row in self._query(
+            "SELECT game_url FROM records GROUP BY game_url ORDER BY MIN(offset)")]
+
+    def tabs(self, game_url):
+        return [row[0] for row in self._query(
+            "SELECT tab FROM records WHERE game_url = ? AND tab != ?", (game_url, PAGE))]
+
+    # (url, page, tabs) of a game, what scrapper.extract_game takes
+    def read_game(self, game_url):
+        page = self.get(game_url, PAGE)
+        tabs = {tab: self.get(game_url, tab).content for tab in self.tabs(game_url)}
+        return game_url, page.content if page else None, tabs
+
+    def __iter__(self):
+        """Every record in the order they were appended."""
+        self._flush()
+        size = self._indexed_end()
+        if size == 0:
+            return
+        data = self._mapped(size)
+        offset = 0
+        while offset < size:
+            record, offset = _decode(data, offset)
+            yield record
+
+    # index of the data file, e.g after the .idx file was lost
+    def rebuild_index(self):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM records")
+            self._flush()
+            size = os.path.getsize(self.path)
+            data = self._mapped(size) if size else b''
+            offset = 0
+            while offset < size:
+                try:
+                    record, end = _decode(data, offset)
+                except (ValueError, zlib.error):
+                    # a half written record at the end
+                    break
+                self.db.execute(
+                    "INSERT OR REPLACE INTO records (game_url, tab, offset, length, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (record.game_url, record.tab, offset, end - offset, record.fetched_at))
+                offset = end
+
+    def size(self):
+        self._flush()
+        return os.path.getsize(self.path)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.fh is not None:
+            self.fh.close()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,504 @@
+"""
+    Name        : Benchmark
+    Date        : 18-10-2026
+    Description : Offline throughput benchmark of the scrapper against a local stub FIBA server.
+"""
+
+
+import argparse
+import contextlib
+import hashlib
+import http.server
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# game path the fixtures were recorded from, rewritten to the requested one
+RECORDED_GAME_PATH = '/afrobasket/2021/pre-qualifiers/game/1401/South-Sudan-Somalia'
+
+FIXTURE_TABS = ['preview', 'team_comparison', 'boxscore', 'play_by_play']
+
+# a run is flagged when a metric gets worse by more than this
+REGRESSION_THRESHOLD = 0.10
+# timings below this many ms are mostly noise and never flagged
+NOISE_MS = 0.05
+# python heap growth per extracted game above which memory isn't flat.
+# The trees of a game are about a MB, lxml's own parser objects (a
+# cycle inside lxml, some KB per parse) are left to the collector
+LEAK_BYTES_PER_GAME = 64 * 1024
+
+
+def load_fixtures(path=FIXTURES_PATH):
+    fixtures = {}
+    for name in ['game', 'roster'] + FIXTURE_TABS:
+        with open(os.path.join(path, name + '.html'), 'rb') as fh:
+            fixtures[name] = fh.read()
+    return fixtures
+
+
+# ------------------------ stub server ------------------------
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fail = server.random.random() < server.error_rate
+
+        if server.latency:
+            time.sleep(server.latency * (0.5 + server.random.random()))
+
+        if fail:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        path = self.path.split('?')[0].rstrip('/')
+        last = path.rsplit('/', 1)[-1]
+        if last in FIXTURE_TABS:
+            body = server.fixtures[last]
+        elif 'roster' in path:
+            body = server.fixtures['roster']
+        else:
+            # every game links to tabs of its own url, like the real site
+            body = server.fixtures['game'].replace(
+                RECORDED_GAME_PATH.encode(), path.encode())
+
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        with server.lock:
+            server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """Local FIBA look-alike replaying the recorded fixtures.
+
+    Every response is delayed by `latency` seconds (+-50% jitter) and a
+    fraction `error_rate` of the requests is answered with a 503.
+    """
+    daemon_threads = True
+
+    def __init__(self, fixtures=None, latency=0.0, error_rate=0.0, port=0, seed=1):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.fixtures = fixtures or load_fixtures()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def game_urls(count):
+    return [f"/benchmark/2024/game/{i:04d}/Team-A-Team-B" for i in range(count)]
+
+
+def peak_rss_kb():
+    """Peak resident memory of this process and its finished children."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children)
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 3)
+
+
+# ------------------------ scenarios ------------------------
+# every scenario runs in a fresh process so its peak rss is its own
+
+def bench_parse(parser, repeat):
+    from parsers import get_parser
+
+    fixtures = load_fixtures()
+    backend = get_parser(parser)
+    results = {'game': _timed(lambda: backend.parse(fixtures['game']), repeat)}
+    for tab in FIXTURE_TABS:
+        results[tab] = _timed(lambda: backend.parse(fixtures[tab]), repeat)
+    return results
+
+
+def bench_extract(parser, repeat):
+    from scrapper import WebScrapper
+
+    fixtures = load_fixtures()
+    scrapper = WebScrapper(parser=parser)
+    scrapper.load(fixtures['game'], 'https://www.fiba.basketball' + RECORDED_GAME_PATH)
+    preview = scrapper.parse_tab('preview', fixtures['preview'])
+    compare = scrapper.parse_tab('team_comparison', fixtures['team_comparison'])
+    boxscore = scrapper.parse_tab('boxscore', fixtures['boxscore'])
+    play_by_play = scrapper.parse_tab('play_by_play', fixtures['play_by_play'])
+
+    results = {'index': _timed(lambda: [scrapper.parser.index(soup) for soup in
+                                        (scrapper.soup, preview, compare, boxscore, play_by_play)], repeat)}
+    for soup in (scrapper.soup, preview, compare, boxscore, play_by_play):
+        scrapper.index(soup)
+
+    methods = {
+        'game_fields': lambda: scrapper.fields('game'),
+        'preview_fields': lambda: scrapper.fields('preview', preview),
+        'get_team_name': lambda: scrapper.get_team_name(team='A'),
+        'get_team_final_score': lambda: scrapper.get_team_final_score(team='A'),
+        'get_quarterly_scores': lambda: scrapper.get_quarterly_scores(team='A'),
+        'get_top_performer': lambda: scrapper.get_top_performer(team='A'),
+        'get_game_group': lambda: scrapper.get_game_group(),
+        'get_game_phase': lambda: scrapper.get_game_phase(),
+        'get_tournament': lambda: scrapper.get_tournament(),
+        'get_game_date': lambda: scrapper.get_game_date(preview),
+        'get_game_time': lambda: scrapper.get_game_time(preview),
+        'get_host_country': lambda: scrapper.get_host_country(preview),
+        'get_game_arena': lambda: scrapper.get_game_arena(preview),
+        'get_team_comparison_stats': lambda: scrapper.get_team_comparison_stats(compare, 'A'),
+        'get_team_lead_stats': lambda: scrapper.get_team_lead_stats(compare, 'A'),
+        'get_boxscore': lambda: scrapper.get_boxscore(soup=boxscore, team='A'),
+        'iter_boxscore': lambda: list(scrapper.iter_boxscore(boxscore)),
+        'get_game_play_by_play': lambda: scrapper.get_game_play_by_play(soup=play_by_play, team='A'),
+        'iter_play_by_play': lambda: list(scrapper.iter_play_by_play(play_by_play)),
+    }
+    for name, method in methods.items():
+        def call():
+            # memoized lookups are timed cold
+            scrapper.memo = {}
+            method()
+        results[name] = _timed(call, repeat)
+    return results
+
+
+def bench_pipeline(parser, games, latency, error_rate, concurrency, workers, rate,
+                   outputs=None):
+    from archive import RawArchive
+    from crawler import AsyncCrawler
+    from instrumentation import get_metrics
+    from pipeline import Pipeline
+    from ratelimit import RateLimiter
+    from scrapper import close_writers, open_writers, save_game, tabs_for
+    from session import create_session
+
+    server = StubServer(latency=latency, error_rate=error_rate).start()
+    session = create_session(pool_maxsize=concurrency,
+                             rate_limiter=RateLimiter(rate=rate, burst=concurrency))
+
+    done = 0
+    with tempfile.TemporaryDirectory() as folder:
+        archive = RawArchive(os.path.join(folder, 'raw', 'responses.warc'))
+        crawler = AsyncCrawler(session=session, concurrency=concurrency,
+                               tabs=tabs_for(outputs), base_url=server.base_url,
+                               archive=archive)
+        pipeline = Pipeline(crawler, workers=workers, parser=parser, outputs=outputs)
+        writers = open_writers(folder)
+        start = time.perf_counter()
+        try:
+            for game in pipeline.run(game_urls(games)):
+                save_game(game, writers)
+                done += 1
+        finally:
+            close_writers(writers)
+        elapsed = time.perf_counter() - start
+        archive_bytes = archive.size()
+        archive.close()
+    server.stop()
+
+    return {
+        'games': done,
+        'seconds': round(elapsed, 3),
+        'games_per_sec': round(done / elapsed, 3),
+        'requests': server.requests,
+        'requests_per_sec': round(server.requests / elapsed, 3),
+        'requests_per_game': round(server.requests / done, 3) if done else None,
+        'bytes': server.bytes_sent,
+        'archive_bytes': archive_bytes,
+        # mean ms of every phase of a game, by phase and tab
+        'span_ms': {'{phase}.{tab}'.format(**span['labels']): span['mean_ms']
+                    for span in get_metrics().summary()['timings'].get('span_seconds', [])
+                    if 'tab' in span['labels']},
+    }
+
+
+def bench_roster(parser, calls, latency):
+    from scrapper import RosterScrapper
+    from session import create_session
+
+    server = StubServer(latency=latency).start()
+    scrapper = RosterScrapper(session=create_session(), parser=parser)
+    start = time.perf_counter()
+    for i in range(calls):
+        scrapper.get_roster(f"{server.base_url}/south-sudan/roster/{i}")
+    elapsed = time.perf_counter() - start
+
+    # the same rosters again, fetched concurrently and deduplicated
+    start = time.perf_counter()
+    table = scrapper.get_rosters(
+        f"{server.base_url}/competition-{i}/team/south-sudan/roster" for i in range(calls))
+    batch = time.perf_counter() - start
+    server.stop()
+    return {
+        'calls': calls,
+        'players_per_call': len(scrapper.roster) // (calls * 2),
+        'ms_per_call': round(elapsed / calls * 1000, 3),
+        'batch_ms': round(batch * 1000, 3),
+        'players': len(table),
+    }
+
+
+# python heap across many extracted games. After a first batch (caches
+# filled, tables like the interned strings grown) a second batch of the
+# same size must leave the traced memory flat: every game's trees are
+# freed as it finishes, not left to the garbage collector
+def bench_memory(parser, games):
+    import gc
+    from scrapper import extract_game, tabs_for
+
+    fixtures = load_fixtures()
+    tabs = {tab: fixtures[tab] for tab in tabs_for()}
+    paths = game_urls(games * 2)
+
+    def run(batch):
+        for path in batch:
+            page = fixtures['game'].replace(RECORDED_GAME_PATH.encode(), path.encode())
+            # the records are handed on and dropped, like the pipeline does
+            extract_game('http://benchmark' + path, page, tabs, parser)
+
+    # with the collector off trees go by reference counting alone
+    gc.disable()
+    tracemalloc.start()
+    try:
+        run(paths[:games])
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        run(paths[games:])
+        elapsed = time.perf_counter() - start
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    growth = after - before
+    return {
+        'games': games,
+        'ms_per_game': round(elapsed * 1000 / games, 3),
+        'growth_kb': round(growth / 1024, 1),
+        'growth_bytes_per_game': round(growth / games, 1),
+        'peak_kb': round(peak / 1024, 1),
+        'flat': growth / games < LEAK_BYTES_PER_GAME,
+    }
+
+
+# extracted records of every backend must match the pure Python ones
+def bench_equivalence():
+    from parsers import available_parsers
+    from scrapper import extract_game
+
+    fixtures = load_fixtures()
+    tabs = {tab: fixtures[tab] for tab in FIXTURE_TABS}
+    url = 'https://www.fiba.basketball' + RECORDED_GAME_PATH
+
+    def records(parser):
+        game = extract_game(url, fixtures['game'], tabs, parser)
+        game.pop('metrics')
+        return game
+
+    reference = records('html.parser')
+    return {parser: records(parser) == reference for parser in available_parsers()}
+
+
+def _run_scenario(queue, name, kwargs):
+    # silence the scrapper's logs, pool workers inherit the fds
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    sys.stdout = io.StringIO()
+    try:
+        result = SCENARIOS[name](**kwargs)
+        queue.put((result, peak_rss_kb(), None))
+    except Exception as e:
+        queue.put((None, peak_rss_kb(), repr(e)))
+
+
+SCENARIOS = {
+    'parse': bench_parse,
+    'extract': bench_extract,
+    'pipeline': bench_pipeline,
+    'roster': bench_roster,
+    'equivalence': bench_equivalence,
+    'memory': bench_memory,
+}
+
+
+def run_scenario(name, **kwargs):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_scenario, args=(queue, name, kwargs))
+    process.start()
+    result, rss, error = queue.get()
+    process.join()
+    if error:
+        raise RuntimeError(f"scenario {name} failed: {error}")
+    if isinstance(result, dict) and name in ('pipeline', 'roster'):
+        result['peak_rss_kb'] = rss
+    return result
+
+
+# ------------------------ reports ------------------------
+
+# metrics where a bigger number is better, every other number is a cost
+HIGHER_IS_BETTER = ('games_per_sec', 'requests_per_sec')
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current, previous, threshold=REGRESSION_THRESHOLD):
+    """Metrics that got worse by more than threshold, name -> (before, now)."""
+    regressions = {}
+    before = flatten(previous.get('results', {}))
+    now = flatten(current.get('results', {}))
+    for name, value in now.items():
+        if name not in before or not before[name]:
+            continue
+        if '_ms.' in name and max(value, before[name]) < NOISE_MS:
+            continue
+        if name.endswith(('.games', '.calls', '.requests_per_game', '.players_per_call', '.players', '.requests', '.bytes', '.archive_bytes', '.growth_kb', '.growth_bytes_per_game')):
+            continue
+        change = (value - before[name]) / before[name]
+        if name.rsplit('.', 1)[-1] in HIGHER_IS_BETTER:
+            change = -change
+        if change > threshold:
+            regressions[name] = (before[name], value)
+    return regressions
+
+
+def main(argv=None):
+    from parsers import available_parsers
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='seconds added to every stub response')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with a 503')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help='requests per second allowed by the rate limiter')
+    parser.add_argument('--parser', default=None,
+                        help='backend of the pipeline and roster runs (fastest installed by default)')
+    parser.add_argument('--outputs', default=None,
+                        help='comma separated outputs of the pipeline run (all by default)')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--roster-calls', type=int, default=20)
+    parser.add_argument('--out', default='benchmark.json')
+    parser.add_argument('--compare', default=None,
+                        help='earlier results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    backend = args.parser or available_parsers()[-1]
+    results = {
+        'equivalence': run_scenario('equivalence'),
+        'parse_ms': {name: run_scenario('parse', parser=name, repeat=args.repeat)
+                     for name in available_parsers()},
+        'extract_ms': {name: run_scenario('extract', parser=name, repeat=args.repeat)
+                       for name in available_parsers()},
+        'pipeline': run_scenario('pipeline', parser=backend, games=args.games,
+                                 latency=args.latency, error_rate=args.error_rate,
+                                 concurrency=args.concurrency, workers=args.workers,
+                                 rate=args.rate,
+                                 outputs=args.outputs.split(',') if args.outputs else None),
+        'roster': run_scenario('roster', parser=backend, calls=args.roster_calls,
+                               latency=args.latency),
+        'memory': {name: run_scenario('memory', parser=name, games=args.games)
+                   for name in available_parsers()},
+    }
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'settings': vars(args),
+        'results': results,
+    }
+
+    with open(args.out, 'w') as fh:
+        json.dump(report, fh, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"results saved to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            previous = json.load(fh)
+        regressions = compare(report, previous, args.threshold)
+        for name, (before, now) in sorted(regressions.items()):
+            print(f"REGRESSION {name}: {before} -> {now}")
+        if regressions:
+            return 1
+    if not all(results['equivalence'].values()):
+        print("parser backends disagree on the extracted records")
+        return 1
+    leaking = [name for name, result in results['memory'].items() if not result['flat']]
+    if leaking:
+        print(f"memory grows with every game with {', '.join(leaking)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    with contextlib.suppress(KeyboardInterrupt):
+        sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+    Name        : Boxscore
+    Date        : 18-10-2026
+    Description : Typed per-player and team totals stat lines out of the boxscore tab.
+"""
+
+
+import sys
+
+from converters import clock_label, to_int, to_made_attempted, to_seconds
+
+
+# classes of the boxscore section of each team
+TEAM_SECTIONS = {'box-score_team-A': 'A', 'box-score_team-B': 'B'}
+
+# counting stats of a line, None when the page had no valid value
+STAT_FIELDS = (
+    'seconds_played', 'points',
+    'fg_made', 'fg_attempted', 'two_made', 'two_attempted',
+    'three_made', 'three_attempted', 'ft_made', 'ft_attempted',
+    'off_rebounds', 'def_rebounds', 'rebounds', 'assists', 'fouls',
+    'turnovers', 'steals', 'blocks', 'plus_minus', 'efficiency',
+)
+
+# column headers of the boxscore table, by the fields they fill. Made /
+# attempted columns ('2/15 13.3%') fill two fields
+COLUMNS = {
+    'no.': 'jersey_number',
+    'no': 'jersey_number',
+    'player': 'player_name',
+    'players': 'player_name',
+    'min': 'seconds_played',
+    'pts': 'points',
+    'fg': ('fg_made', 'fg_attempted'),
+    '2pts': ('two_made', 'two_attempted'),
+    '2pt': ('two_made', 'two_attempted'),
+    '3pts': ('three_made', 'three_attempted'),
+    '3pt': ('three_made', 'three_attempted'),
+    'ft': ('ft_made', 'ft_attempted'),
+    'oreb': 'off_rebounds',
+    'or': 'off_rebounds',
+    'dreb': 'def_rebounds',
+    'dr': 'def_rebounds',
+    'reb': 'rebounds',
+    'ast': 'assists',
+    'pf': 'fouls',
+    'to': 'turnovers',
+    'stl': 'steals',
+    'blk': 'blocks',
+    '+/-': 'plus_minus',
+    'eff': 'efficiency',
+}
+
+
+class BoxscoreLine:
+    """One row of a team's boxscore, a player or the team totals.
+
+    `team` is 'A' or 'B', `totals` marks the team totals row and `played`
+    is False for players who didn't play (their stats are all None).
+    Minutes are `seconds_played`, shooting columns are split into made and
+    attempted ints.
+    """
+    __slots__ = ('team', 'totals', 'jersey_number', 'player_name', 'played') + STAT_FIELDS
+
+    def __init__(self, team, player_name, jersey_number=None, totals=False, played=True,
+                 **stats):
+        self.team = team
+        self.totals = totals
+        self.jersey_number = jersey_number
+        self.player_name = player_name
+        self.played = played
+        for name in STAT_FIELDS:
+            setattr(self, name, stats.pop(name, None))
+        if stats:
+            raise TypeError(f"unknown stats {sorted(stats)}")
+
+    def values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, BoxscoreLine) and self.values() == other.values()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"BoxscoreLine({fields})"
+
+    # pickled as a plain tuple, like PlayEvent
+    def __reduce__(self):
+        return _from_values, (self.values(),)
+
+    @property
+    def minutes(self):
+        return clock_label(self.seconds_played)
+
+    # csv row of the line, see scrapper.BOXSCORE_FIELDS
+    def to_dict(self, team_names=('', '')):
+        names = dict(zip('AB', team_names))
+        row = {
+            'team': names[self.team],
+            'opponent': names['B' if self.team == 'A' else 'A'],
+            'jersey_number': self.jersey_number or '',
+            'player_name': self.player_name,
+            'totals': int(self.totals),
+            'played': int(self.played),
+        }
+        for name in STAT_FIELDS:
+            value = getattr(self, name)
+            row[name] = '' if value is None else value
+        return row
+
+
+def _from_values(values):
+    line = BoxscoreLine.__new__(BoxscoreLine)
+    for name, value in zip(BoxscoreLine.__slots__, values):
+        setattr(line, name, value)
+    return line
+
+
+def _classes(element):
+    classes = element.get('class') or []
+    return classes.split() if isinstance(classes, str) else classes
+
+
+# team ('A' or 'B') of a boxscore section element, None for anything else
+def section_team(element):
+    for name in _classes(element):
+        if name in TEAM_SECTIONS:
+            return TEAM_SECTIONS[name]
+    return None
+
+
+# fields filled by each column of a section's table, None for unknown columns
+def section_columns(section):
+    head = section.find('thead')
+    cells = head.find_all('th') if head is not None else []
+    return [COLUMNS.get(cell.text.strip().lower()) for cell in cells]
+
+
+def parse_line(row, columns, team, totals=False):
+    """BoxscoreLine of one `tr` of a boxscore table."""
+    cells = row.find_all('td')
+    values = {}
+    for field, cell in zip(columns, cells):
+        if field is None:
+            continue
+        if field == 'player_name':
+            name = cell.find('span', {'class': 'player-name'})
+            values[field] = sys.intern((name if name is not None else cell).text.strip())
+        elif field == 'jersey_number':
+            values[field] = cell.text.strip()
+        elif field == 'seconds_played':
+            values[field] = to_seconds(cell.text)
+        elif isinstance(field, tuple):
+            values[field[0]], values[field[1]] = to_made_attempted(cell.text)
+        else:
+            values[field] = to_int(cell.text)
+
+    # players who didn't play have one cell spanning the stats (DNP)
+    played = 'not-played' not in _classes(row) and not any(
+        cell.get('colspan') for cell in cells)
+    if not played:
+        values = {field: values[field] for field in ('jersey_number', 'player_name')
+                  if field in values}
+    return BoxscoreLine(team, values.pop('player_name', ''), totals=totals,
+                        played=played, **values)
+
+
+def parse_section(section, team=None):
+    """Lines of one team's boxscore section, players first then the totals."""
+    if team is None:
+        team = section_team(section)
+    columns = section_columns(section)
+    lines = []
+    body = section.find('tbody')
+    for row in body.find_all('tr') if body is not None else []:
+        lines.append(parse_line(row, columns, team))
+    foot = section.find('tfoot')
+    for row in foot.find_all('tr') if foot is not None else []:
+        lines.append(parse_line(row, columns, team, totals=True))
+    return lines
@@ -0,0 +1,220 @@
+"""
+    Name        : Response Cache
+    Date        : 18-10-2026
+    Description : Persistent, size bounded on-disk cache of HTTP responses.
+"""
+
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from paths import make_parent
+
+
+# request headers which change the body the server sends back
+VARY_HEADERS = ('Accept', 'X-Requested-With')
+
+# response headers worth keeping with the body
+KEEP_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date')
+
+# 500MB of compressed bodies
+MAX_SIZE = 500 * 1024 * 1024
+
+# None means the entry never expires
+FOREVER = None
+
+
+def normalize_url(url):
+    """Lower case scheme and host, sort the query and drop the fragment."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def cache_key(url, headers=None):
+    key = normalize_url(url)
+    headers = CaseInsensitiveDict(headers or {})
+    for name in VARY_HEADERS:
+        key += f"\n{name.lower()}:{headers.get(name, '')}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class CacheEntry:
+    def __init__(self, key, url, status_code, headers, body, stored_at, pinned=False):
+        self.key = key
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.pinned = pinned
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    def age(self):
+        return time.time() - self.stored_at
+
+    # rebuild a requests.Response so callers can't tell it from a fetched one
+    def to_response(self):
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.url = self.url
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """Response bodies stored zlib compressed in a SQLite file.
+
+    Entries are keyed by the normalized url plus the request headers in
+    VARY_HEADERS. How long an entry stays fresh is decided by the first
+    `(pattern, ttl)` of `ttl_rules` whose regex matches the url, falling back
+    to `default_ttl` (ttl in seconds, FOREVER for never). Stale entries with
+    an ETag or Last-Modified are revalidated with a conditional request.
+    Entries known not to change any more (e.g the pages of a finished
+    game) are pinned with pin() and stay fresh whatever their ttl.
+    When the bodies grow over `max_size` bytes the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, path, max_size=MAX_SIZE, ttl_rules=None, default_ttl=0):
+        self.path = path
+        self.max_size = max_size
+        self.ttl_rules = [(re.compile(pattern), ttl)
+                          for pattern, ttl in (ttl_rules or [])]
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        make_parent(path)
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                pinned INTEGER NOT NULL DEFAULT 0
+            )""")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.db.commit()
+
+    def ttl(self, url):
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def is_fresh(self, entry):
+        if entry.pinned:
+            return True
+        ttl = self.ttl(entry.url)
+        return ttl is FOREVER or entry.age() < ttl
+
+    def get(self, url, headers=None):
+        key = cache_key(url, headers)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, status_code, headers, body, stored_at, pinned FROM responses "
+                "WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+
+        url, status_code, stored_headers, body, stored_at, pinned = row
+        return CacheEntry(key, url, status_code, json.loads(stored_headers),
+                          zlib.decompress(body), stored_at, bool(pinned))
+
+    def store(self, url, headers, response):
+        key = cache_key(url, headers)
+        kept = {name: response.headers[name]
+                for name in KEEP_HEADERS if name in response.headers}
+        body = zlib.compress(response.content)
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, normalize_url(url), response.status_code, json.dumps(kept),
+                 body, len(body), now, now))
+            self.db.commit()
+            self._evict()
+
+    # a 304 came back, the stored body is good for another ttl
+    def refresh(self, entry):
+        entry.stored_at = time.time()
+        with self.lock:
+            self.db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (entry.stored_at, entry.stored_at, entry.key))
+            self.db.commit()
+
+    # keep the entries of a url and of every url under its path fresh for
+    # good, e.g a game page and its ajax tabs once the game is final.
+    # Returns the number of entries pinned
+    def pin(self, url):
+        url = normalize_url(url).rstrip('/')
+        with self.lock:
+            cursor = self.db.execute(
+                "UPDATE responses SET pinned = 1 WHERE url = ? OR substr(url, 1, ?) = ?",
+                (url, len(url) + 1, url + '/'))
+            self.db.commit()
+            return cursor.rowcount
+
+    def size(self):
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        total = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size:
+            return
+        evict = []
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_size:
+                break
+            evict.append((key,))
+            total -= size
+        self.db.executemany("DELETE FROM responses WHERE key = ?", evict)
+        self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
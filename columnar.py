@@ -0,0 +1,226 @@
+"""
+    Name        : Columnar Export
+    Date        : 18-10-2026
+    Description : Typed Parquet / Arrow IPC datasets of the play by play, boxscores and games in brief.
+"""
+
+
+import os
+import re
+
+from boxscore import STAT_FIELDS
+from converters import to_date, to_int, to_seconds
+from scrapper import tournament_from_url
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+FORMATS = ('parquet', 'arrow')
+
+
+def available():
+    return pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError(
+            "columnar output needs pyarrow (pip install pyarrow)")
+
+
+# file name of a game inside a partition, e.g 1401_South-Sudan-Somalia
+def game_id(url):
+    parts = [part for part in str(url).split('/') if part][-2:]
+    return re.sub(r'[^\w.-]', '_', '_'.join(parts)) or 'game'
+
+
+# ------------------------ schemas ------------------------
+
+def _category():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def play_by_play_schema():
+    _require_pyarrow()
+    return pa.schema([
+        ('game_url', pa.string()),
+        ('event', pa.int32()),
+        ('team', _category()),
+        ('opponent', _category()),
+        ('period', pa.int8()),
+        ('clock_seconds', pa.int16()),
+        ('athlete_name', _category()),
+        ('description', _category()),
+        ('team_score', pa.int16()),
+        ('opp_score', pa.int16()),
+        ('athlete_image', pa.string()),
+    ])
+
+
+def boxscore_schema():
+    _require_pyarrow()
+    fields = [
+        ('game_url', pa.string()),
+        ('team', _category()),
+        ('opponent', _category()),
+        ('jersey_number', pa.string()),
+        ('player_name', _category()),
+        ('totals', pa.bool_()),
+        ('played', pa.bool_()),
+    ]
+    # totals of a team run past the int16 range in seconds
+    fields += [(name, pa.int32() if name == 'seconds_played' else pa.int16())
+               for name in STAT_FIELDS]
+    return pa.schema(fields)
+
+
+# integer columns of the games in brief, everything else is a string
+GAME_INT_FIELDS = [
+    'final_score', 'Q1', 'Q2', 'Q3', 'Q4', 'OT1', 'OT2', 'OT3',
+    'points_from_turnover', 'second_chance_points', 'fast_break_points',
+    'points_in_the_paint', 'points_from_the_bench', 'biggest_lead',
+]
+
+
+def games_schema():
+    _require_pyarrow()
+    fields = [
+        ('game_url', pa.string()),
+        ('date', pa.date32()),
+        ('time', pa.string()),
+        ('arena', _category()),
+        ('city_or_country', _category()),
+        ('phase', _category()),
+        ('group', _category()),
+        ('team', _category()),
+        ('opponent', _category()),
+        ('result', _category()),
+        ('top_performer', pa.string()),
+        ('top_performer_img', pa.string()),
+        ('biggest_scoring_run', pa.string()),
+        ('times_leading_seconds', pa.int32()),
+    ]
+    fields += [(name, pa.int16()) for name in GAME_INT_FIELDS]
+    return pa.schema(fields)
+
+
+# ------------------------ row converters ------------------------
+
+def play_by_play_columns(game):
+    columns = {name: [] for name in play_by_play_schema().names}
+    team_names = dict(zip(['A', 'B'], game['team_names']))
+    for play in game['play_by_play']:
+        columns['game_url'].append(game['url'])
+        columns['event'].append(play.event)
+        columns['team'].append(team_names[play.team])
+        columns['opponent'].append(team_names['B' if play.team == 'A' else 'A'])
+        columns['period'].append(play.period)
+        columns['clock_seconds'].append(play.clock_seconds)
+        columns['athlete_name'].append(play.athlete_name)
+        columns['description'].append(play.description)
+        columns['team_score'].append(play.team_score)
+        columns['opp_score'].append(play.opp_score)
+        columns['athlete_image'].append(play.athlete_image)
+    return columns
+
+
+def boxscore_columns(game):
+    columns = {name: [] for name in boxscore_schema().names}
+    team_names = dict(zip(['A', 'B'], game['team_names']))
+    for line in game['boxscore']:
+        columns['game_url'].append(game['url'])
+        columns['team'].append(team_names[line.team])
+        columns['opponent'].append(team_names['B' if line.team == 'A' else 'A'])
+        columns['jersey_number'].append(line.jersey_number)
+        columns['player_name'].append(line.player_name)
+        columns['totals'].append(line.totals)
+        columns['played'].append(line.played)
+        for name in STAT_FIELDS:
+            columns[name].append(getattr(line, name))
+    return columns
+
+
+def games_columns(game):
+    schema = games_schema()
+    columns = {name: [] for name in schema.names}
+    for row in game['game_in_brief']:
+        for name in schema.names:
+            if name == 'game_url':
+                value = game['url']
+            elif name == 'date':
+                value = to_date(row.get('date'))
+            elif name == 'times_leading_seconds':
+                value = to_seconds(row.get('times_leading'))
+            elif name in GAME_INT_FIELDS:
+                value = to_int(row.get(name))
+            else:
+                value = row.get(name)
+            columns[name].append(value)
+    return columns
+
+
+class ColumnarWriter:
+    """Typed play by play, boxscore and games in brief datasets, written game
+    by game.
+
+    Every finished game adds one file per dataset under
+    `root/<dataset>/tournament=<name>/<game>.<parquet|arrow>`, a hive
+    partitioned layout that read_dataset loads in one vectorized read.
+    """
+
+    def __init__(self, root, format='parquet'):
+        _require_pyarrow()
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}")
+        self.root = root
+        self.format = format
+        self.files_written = 0
+
+    def _write(self, dataset, tournament, name, columns, schema):
+        table = pa.table(columns, schema=schema)
+        folder = os.path.join(self.root, dataset, f"tournament={tournament}")
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        filename = os.path.join(folder, f"{name}.{self.format}")
+        # written to a hidden file first (datasets skip names starting with
+        # a dot), a crash never leaves half a file in the dataset
+        partial = os.path.join(folder, f".{name}.{self.format}.part")
+        if self.format == 'parquet':
+            pq.write_table(table, partial)
+        else:
+            feather.write_feather(table, partial, compression='zstd')
+        os.replace(partial, filename)
+        self.files_written += 1
+
+    # each dataset the game has rows for, a run building only some outputs
+    # writes those
+    def write_game(self, game):
+        tournament = tournament_from_url(game['url'])
+        name = game_id(game['url'])
+        if game['game_in_brief']:
+            self._write('games_in_brief', tournament, name,
+                        games_columns(game), games_schema())
+        if game['play_by_play']:
+            self._write('play_by_play', tournament, name,
+                        play_by_play_columns(game), play_by_play_schema())
+        if game['boxscore']:
+            self._write('boxscore', tournament, name,
+                        boxscore_columns(game), boxscore_schema())
+
+    def close(self):
+        pass
+
+
+def read_dataset(root, dataset, format='parquet'):
+    """Load a whole dataset (every game of every tournament) as one table."""
+    _require_pyarrow()
+    path = os.path.join(root, dataset)
+    return ds.dataset(path, format='ipc' if format == 'arrow' else format,
+                      partitioning='hive').to_table()
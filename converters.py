@@ -0,0 +1,70 @@
+"""
+    Name        : Value Converters
+    Date        : 18-10-2026
+    Description : Typed values out of the strings shown on the game pages.
+"""
+
+
+import re
+from datetime import datetime
+
+
+# periods after the fourth quarter are numbered on from 5
+PERIODS = {'Q1': 1, 'Q2': 2, 'Q3': 3, 'Q4': 4, 'OT': 5}
+
+PERIOD = re.compile(r'^(Q|OT)(\d+)$')
+CLOCK = re.compile(r'^\s*(\d+):(\d{1,2})\s*$')
+MADE_ATTEMPTED = re.compile(r'^\s*(\d+)\s*/\s*(\d+)')
+
+
+def to_int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+# 'Q3' -> 3, 'OT1' -> 5, 'OT2' -> 6
+def to_period(value):
+    value = str(value or '').strip().upper()
+    if value in PERIODS:
+        return PERIODS[value]
+    match = PERIOD.match(value)
+    if match is None:
+        return None
+    number = int(match.group(2))
+    return number if match.group(1) == 'Q' else 4 + number
+
+
+# '09:45' -> 585
+def to_seconds(value):
+    match = CLOCK.match(str(value or ''))
+    if match is None:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+# 585 -> '09:45', the reverse of to_seconds
+def clock_label(seconds):
+    if seconds is None:
+        return ''
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+# 'Friday 23 July 2021' -> date(2021, 7, 23)
+def to_date(value):
+    value = str(value or '').strip()
+    for fmt in ('%A %d %B %Y', '%d %B %Y', '%a %d %b %Y'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+# '2/15 13.3%' -> (2, 15), (None, None) when there is no such value
+def to_made_attempted(value):
+    match = MADE_ATTEMPTED.match(str(value or ''))
+    if match is None:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
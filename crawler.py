@@ -0,0 +1,168 @@
+"""
+    Name        : Async Crawler
+    Date        : 18-10-2026
+    Description : Concurrent crawl engine fetching game pages and their ajax tabs.
+"""
+
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import get_logger, get_metrics
+from scrapper import AJAX_HEADERS, BASE_URL, GAME_TABS, absolute_url, find_ajax_urls
+from session import get_session
+
+
+log = get_logger(__name__)
+
+
+# marks a crawl worker running out of urls
+_DONE = object()
+
+
+class AsyncCrawler:
+    """Crawl many games at once, limited to `concurrency` requests in flight.
+
+    Requests are made with the (blocking) pooled session on a thread pool
+    and awaited from asyncio, so games are crawled concurrently and the tabs
+    of a game are fetched concurrently too. Nothing is parsed here, every
+    crawled game is handed back as a `(url, page, tabs)` tuple of raw bytes
+    ready for scrapper.extract_game. With an `archive` (archive.RawArchive)
+    every response is archived with its headers as it arrives.
+    """
+
+    def __init__(self, session=None, concurrency=4, tabs=None, base_url=BASE_URL,
+                 metrics=None, archive=None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.session = session if session is not None else get_session()
+        self.concurrency = concurrency
+        self.tabs = list(tabs) if tabs is not None else list(GAME_TABS)
+        self.base_url = base_url
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self.archive = archive
+        self.headers = dict(AJAX_HEADERS)
+        self.executor = None
+        self.semaphore = None
+
+    def _get(self, url, headers=None, tab='game', game_url=None):
+        with self.metrics.span('fetch', url, tab=tab):
+            response = self.session.get(url, headers=headers)
+        if response.status_code != 200:
+            log.error("fetch failed", url=url, tab=tab,
+                      status=response.status_code)
+            return None
+        if self.archive is not None:
+            self.archive.append_response(game_url or url, tab, response)
+        return response.content
+
+    async def fetch(self, url, headers=None, tab='game', game_url=None):
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            try:
+                return await loop.run_in_executor(
+                    self.executor, self._get, url, headers, tab, game_url)
+            except Exception as e:
+                log.error("fetch failed", url=url, tab=tab, error=e)
+                return None
+
+    async def crawl_game(self, url):
+        url = absolute_url(url, self.base_url)
+
+        page = await self.fetch(url)
+        if page is None:
+            return None
+
+        # all tabs of the game are requested at once
+        ajax_urls = find_ajax_urls(page, self.tabs)
+        tab_urls = {}
+        for tab in self.tabs:
+            if ajax_urls.get(tab):
+                tab_urls[tab] = absolute_url(ajax_urls[tab], self.base_url)
+            else:
+                log.warning("no ajax link", url=url, tab=tab)
+
+        contents = await asyncio.gather(
+            *[self.fetch(tab_url, headers=self.headers, tab=tab, game_url=url)
+              for tab, tab_url in tab_urls.items()])
+        return url, page, dict(zip(tab_urls.keys(), contents))
+
+    # async generator of (url, page, tabs) in completion order. urls is any
+    # iterable, or an async iterable streaming them in (e.g
+    # discovery.ScheduleDiscovery.discover)
+    async def crawl(self, urls):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        # bounded so fetching stops when the consumer falls behind
+        results = asyncio.Queue(maxsize=self.concurrency)
+        tasks = []
+
+        if hasattr(urls, '__aiter__'):
+            # one task drives the async iterable, workers take turns on the queue
+            pending = asyncio.Queue(maxsize=self.concurrency)
+
+            async def feed():
+                try:
+                    async for url in urls:
+                        await pending.put(url)
+                except Exception as e:
+                    log.error("url source failed", error=e)
+                for _ in range(self.concurrency):
+                    await pending.put(_DONE)
+
+            tasks.append(asyncio.ensure_future(feed()))
+            next_url = pending.get
+        else:
+            remaining = iter(urls)
+
+            async def next_url():
+                return next(remaining, _DONE)
+
+        async def worker():
+            while True:
+                url = await next_url()
+                if url is _DONE:
+                    break
+                try:
+                    game = await self.crawl_game(url)
+                except Exception as e:
+                    log.error("crawl failed", url=url, error=e)
+                    game = None
+                await results.put(game)
+            await results.put(_DONE)
+
+        workers = [asyncio.ensure_future(worker())
+                   for _ in range(self.concurrency)]
+        tasks += workers
+        try:
+            finished = 0
+            while finished < len(workers):
+                item = await results.get()
+                if item is _DONE:
+                    finished += 1
+                elif item is not None:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.executor.shutdown(wait=False)
+
+    # blocking generator over crawl() for plain (non async) callers
+    def run(self, urls):
+        return iterate(self.crawl(urls))
+
+
+# drive an async generator from plain code, one item at a time
+def iterate(agen):
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
@@ -0,0 +1,224 @@
+"""
+    Name        : Schedule Discovery
+    Date        : 18-10-2026
+    Description : Find the game urls of a competition from its schedule pages.
+"""
+
+
+import argparse
+import asyncio
+import csv
+import html
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from cache import normalize_url
+from crawler import iterate
+from instrumentation import get_logger, get_metrics
+from scrapper import BASE_URL, absolute_url
+from session import get_session
+
+
+log = get_logger(__name__)
+
+# href of every <a> tag, read straight from the page bytes like find_ajax_urls
+A_HREF = re.compile(
+    r'<a\b[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
+# path of a game page, e.g /afrobasket/2021/pre-qualifiers/game/1401/South-Sudan-Somalia
+GAME_PATH = re.compile(r'/game/(\d+)(?:/([^/]*))?/?$')
+
+# paths of the pages listing games, followed within the competition
+SCHEDULE_PATH = re.compile(r'/(schedule|games|results)(/|$)')
+
+# schedule pages fetched per discovery at most
+MAX_PAGES = 200
+
+
+# competition part of a schedule url, only pages under it are followed
+def competition_prefix(url):
+    path = urlsplit(url).path.rstrip('/')
+    match = SCHEDULE_PATH.search(path)
+    return path[:match.start()] if match else path
+
+
+# games-links.csv name of a game url, e.g game_1401_south_sudan_somalia
+def game_name(url):
+    match = GAME_PATH.search(urlsplit(url).path)
+    slug = (match.group(2) or '').lower().replace('-', '_')
+    return f"game_{match.group(1)}_{slug}" if slug else f"game_{match.group(1)}"
+
+
+class ScheduleDiscovery:
+    """Walk the schedule pages of competitions and find their games.
+
+    Starting from schedule or results pages, the links of every page are
+    read, game links are handed out as soon as they are found and the
+    other schedule pages of the same competition (groups, phases, pages)
+    are followed, `concurrency` at a time and at most `max_pages` in all.
+    Links are made absolute against `base_url` like the urls of
+    games-links.csv, every page and game is seen once. Pages go through the
+    session, with a ResponseCache a re-run revalidates the schedule pages
+    and only downloads the ones that changed (see CACHE_TTL_RULES).
+    """
+
+    def __init__(self, session=None, concurrency=4, base_url=BASE_URL,
+                 max_pages=MAX_PAGES, metrics=None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.session = session if session is not None else get_session()
+        self.concurrency = concurrency
+        self.base_url = base_url
+        self.host = urlsplit(base_url).netloc.lower()
+        self.max_pages = max_pages
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self.visited = set()
+        self.games = set()
+
+    def absolute_url(self, href, page_url=None):
+        """Absolute url of a link, None for links off the site."""
+        href = html.unescape(href.strip())
+        url = urljoin(page_url or self.base_url, absolute_url(href, self.base_url))
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or parts.netloc.lower() != self.host:
+            return None
+        return normalize_url(url)
+
+    def links(self, content, page_url, prefix):
+        """Game urls and schedule page urls linked from a page."""
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='replace')
+        games, pages = [], []
+        for double, single in A_HREF.findall(content):
+            url = self.absolute_url(double or single, page_url)
+            if url is None:
+                continue
+            parts = urlsplit(url)
+            if GAME_PATH.search(parts.path):
+                # the query of a game link is only tracking or a tab
+                games.append(urlunsplit(parts._replace(query='')))
+            elif parts.path.startswith(prefix) and SCHEDULE_PATH.search(parts.path):
+                pages.append(url)
+        return games, pages
+
+    def _get(self, url):
+        with self.metrics.span('discover', url):
+            response = self.session.get(url)
+        if response.status_code != 200:
+            log.error("schedule page failed", url=url, status=response.status_code)
+            return None
+        return response.content
+
+    async def _fetch(self, url, executor, semaphore):
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            try:
+                return url, await loop.run_in_executor(executor, self._get, url)
+            except Exception as e:
+                log.error("schedule page failed", url=url, error=e)
+                return url, None
+
+    async def discover(self, start_urls):
+        """Async generator of the game urls not seen before, as found."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        frontier = []
+        for url in start_urls:
+            url = self.absolute_url(url)
+            if url is not None and url not in self.visited:
+                self.visited.add(url)
+                frontier.append((url, competition_prefix(url)))
+
+        fetched = 0
+        try:
+            # breadth first, the pages of one level are fetched at once
+            while frontier and fetched < self.max_pages:
+                level = frontier[:self.max_pages - fetched]
+                fetched += len(level)
+                frontier = []
+                prefixes = dict(level)
+                for future in asyncio.as_completed(
+                        [self._fetch(url, executor, semaphore) for url, _ in level]):
+                    url, content = await future
+                    if content is None:
+                        continue
+                    self.metrics.inc('schedule_pages_total')
+                    games, pages = self.links(content, url, prefixes[url])
+                    for page in pages:
+                        if page not in self.visited:
+                            self.visited.add(page)
+                            frontier.append((page, prefixes[url]))
+                    for game in games:
+                        if game not in self.games:
+                            self.games.add(game)
+                            self.metrics.inc('games_discovered_total')
+                            yield game
+            if frontier:
+                log.warning("schedule pages left", pages=len(frontier),
+                            max_pages=self.max_pages)
+        finally:
+            executor.shutdown(wait=False)
+        log.info("discovery finished", pages=fetched, games=len(self.games))
+
+    # blocking list of the game urls, for plain (non async) callers
+    def run(self, start_urls):
+        return list(iterate(self.discover(start_urls)))
+
+
+# async stream of the urls for which done(url) is false, e.g the games of
+# a schedule not crawled yet
+async def not_done(urls, done):
+    async for url in urls:
+        if not done(url):
+            yield url
+
+
+# add the game urls not in a games-links csv yet, returns the new ones
+def update_links(filename, urls, base_url=BASE_URL):
+    known = set()
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        with open(filename, 'r', newline='') as fh:
+            known = {row['url'] for row in csv.DictReader(fh)}
+    # the csv keeps paths, like the hand written rows
+    paths = [url[len(base_url):] if url.startswith(base_url) else url for url in urls]
+    new = [path for path in paths if path not in known]
+
+    write_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with open(filename, 'a', newline='') as fh:
+        writer = csv.writer(fh)
+        if write_header:
+            writer.writerow(['game', 'url'])
+        for path in new:
+            writer.writerow([game_name(path), path])
+    return new
+
+
+if __name__ == '__main__':
+    from instrumentation import setup_logging
+    from ratelimit import RateLimiter
+    from cache import ResponseCache
+    from scrapper import CACHE_DEFAULT_TTL, CACHE_TTL_RULES
+    from session import create_session
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('schedule', nargs='+', help="schedule or results page urls")
+    parser.add_argument('--links', default='games-links.csv',
+                        help="csv the new game urls are added to")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--max-pages', type=int, default=MAX_PAGES)
+    args = parser.parse_args()
+
+    setup_logging(os.environ.get('SCRAPPER_LOG_LEVEL', 'INFO'),
+                  json_lines=os.environ.get('SCRAPPER_LOG_JSON') == '1')
+    cache = ResponseCache("final/cache/responses.sqlite", ttl_rules=CACHE_TTL_RULES,
+                          default_ttl=CACHE_DEFAULT_TTL)
+    session = create_session(pool_maxsize=args.concurrency,
+                             rate_limiter=RateLimiter(rate=2.0, burst=4), cache=cache)
+    discovery = ScheduleDiscovery(session=session, concurrency=args.concurrency,
+                                  max_pages=args.max_pages)
+    new = update_links(args.links, discovery.run(args.schedule))
+    log.info("links updated", filename=args.links, new_games=len(new),
+             cache_hits=cache.hits, revalidated=cache.revalidated, cache_misses=cache.misses)
+    cache.close()
@@ -0,0 +1,116 @@
+"""
+    Name        : Field Spec
+    Date        : 18-10-2026
+    Description : Declarative spec of the single value fields of a page, compiled once.
+"""
+
+
+import re
+
+
+# teams of the per team fields, `{team}` in their paths
+TEAMS = ('A', 'B')
+
+# one step of a path, a tag name (or *) and at most one class, e.g div.date_infos
+STEP = re.compile(r'^([\w-]+|\*)?(?:\.([\w-]+))?$')
+
+
+# stripped text of the elements found, space separated when there are
+# many. Optional elements not found (None) are left out
+def text(*elements):
+    return ' '.join(element.text.strip() for element in elements if element is not None)
+
+
+# reader of an attribute of the element found, e.g attr('src')
+def attr(name):
+    def read(element):
+        return element[name]
+    return read
+
+
+class Field:
+    """One value of a page, where it is and how it is read.
+
+    `paths` are css like descendant paths ('div.date_infos div.date'), a
+    path or a list of them. `read` turns the elements found (one per path)
+    into the value, their stripped text by default. A path ending in '?'
+    is optional, when it isn't found the reader gets None for it instead of
+    the field being a miss. `{team}` in a path makes a per team field, read
+    once for each of TEAMS. A field not found is `default`.
+    """
+
+    def __init__(self, name, page, paths, read=text, default="Unknown"):
+        self.name = name
+        self.page = page
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.read = read
+        self.default = default
+        self.per_team = any('{team}' in path for path in self.paths)
+
+
+# (tag, class) steps of a path and whether it is optional. The first step
+# is looked up in the page's index, so it needs a class
+def compile_path(path):
+    optional = path.endswith('?')
+    steps = []
+    for part in path.rstrip('?').split():
+        match = STEP.match(part)
+        if match is None:
+            raise ValueError(f"bad step {part!r} in path {path!r}")
+        tag, class_ = match.groups()
+        steps.append((None if tag in (None, '*') else tag, class_))
+    if not steps or steps[0][1] is None:
+        raise ValueError(f"the first step of path {path!r} needs a class")
+    return steps, optional
+
+
+def _resolve(index, path, steps, optional=False):
+    tag, class_ = steps[0]
+    element = index.find(tag, class_)
+    for tag, class_ in steps[1:]:
+        if element is None:
+            break
+        element = element.find(tag, {'class': class_} if class_ else None)
+    if element is None and not optional:
+        raise LookupError(f"{path} not found")
+    return element
+
+
+class FieldSpec:
+    """Fields compiled once into the lookups that read them, by page.
+
+    Paths are parsed and the per team fields expanded when the spec is
+    built. evaluate() reads every field of a page out of the page's
+    ElementIndex (or SelectorIndex), so the tree is walked once however
+    many fields there are. A field that isn't found comes back as its
+    default, with a miss record telling which field, team and path.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.pages = {}
+        for field in self.fields:
+            for team in (TEAMS if field.per_team else (None,)):
+                paths = [path.format(team=team) if team else path for path in field.paths]
+                self.pages.setdefault(field.page, []).append(
+                    (field, team, [(path.rstrip('?'), *compile_path(path)) for path in paths]))
+
+    def evaluate(self, page, index):
+        """Values of the fields of `page` by (name, team), and the misses.
+
+        `index` is None when the page is missing, every field is a miss.
+        """
+        values = {}
+        misses = []
+        for field, team, paths in self.pages.get(page, []):
+            try:
+                if index is None:
+                    raise LookupError(f"no {page} page")
+                values[field.name, team] = field.read(
+                    *[_resolve(index, path, steps, optional)
+                      for path, steps, optional in paths])
+            except Exception as e:
+                values[field.name, team] = field.default
+                misses.append({'field': field.name, 'page': page, 'team': team,
+                               'error': str(e)})
+        return values, misses
@@ -0,0 +1,214 @@
+"""
+    Name        : Image Store
+    Date        : 18-10-2026
+    Description : Concurrent, deduplicated downloads of player images into a content addressed store.
+"""
+
+
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlsplit
+
+from instrumentation import get_logger, get_metrics
+from session import get_session
+
+
+log = get_logger(__name__)
+
+# bytes read from the network and written to disk at a time
+CHUNK_SIZE = 64 * 1024
+
+# extension of files whose type can't be told from the response or url
+DEFAULT_EXTENSION = '.img'
+
+
+# image urls of an extracted game (see WebScrapper.extract_game)
+def game_image_urls(game):
+    for row in game.get('game_in_brief', []):
+        yield row.get('top_performer_img')
+    for play in game.get('play_by_play', []):
+        yield play.athlete_image
+
+
+# image urls of the players of a roster (see RosterScrapper.get_roster)
+def roster_image_urls(players):
+    for player in players:
+        yield player.get('player_img')
+
+
+class ImageStore:
+    """Every image of a crawl downloaded once, stored under its content hash.
+
+    Urls are collected with add() / add_game() / add_roster() for the whole
+    crawl, each distinct url is downloaded once by download(), `concurrency`
+    at a time over the pooled session and streamed to disk chunk by chunk.
+    Files are named by the sha256 of their bytes,
+    `root/<first 2 hex digits>/<hash><ext>`, so images served under many
+    urls are stored once. `root/index.sqlite` maps every url to its hash,
+    urls already in the index with the file on disk are never fetched again.
+    Urls waiting for download() are kept in the index too, as soon as they
+    are added. Images of games a crashed crawl already finished are fetched
+    by the next download(), and so are images whose download failed.
+    """
+
+    def __init__(self, root, session=None, concurrency=8, base_url=None, metrics=None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.root = root
+        self.session = session if session is not None else get_session()
+        self.concurrency = concurrency
+        self.base_url = base_url
+        self.metrics = metrics if metrics is not None else get_metrics()
+
+        if not os.path.exists(root):
+            os.makedirs(root)
+        self.db = sqlite3.connect(os.path.join(root, 'index.sqlite'))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                downloaded_at REAL NOT NULL
+            )""")
+        # urls waiting for download(), in the order they were first seen
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE
+            )""")
+        self.db.commit()
+
+    def _normalize(self, url):
+        if not url or not isinstance(url, str):
+            return None
+        url = url.strip()
+        if self.base_url and url.startswith('/'):
+            url = urljoin(self.base_url, url)
+        if urlsplit(url).scheme not in ('http', 'https'):
+            # placeholders like 'unknown'
+            return None
+        return url
+
+    # path of the stored image of a url, None when it isn't on disk
+    def path(self, url):
+        row = self.db.execute(
+            "SELECT filename FROM images WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        filename = os.path.join(self.root, row[0])
+        return filename if os.path.exists(filename) else None
+
+    def add(self, url):
+        self.add_many([url])
+
+    # urls are committed to the index before this returns
+    def add_many(self, urls):
+        urls = [(url,) for url in map(self._normalize, urls) if url is not None]
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO pending (url) VALUES (?)", urls)
+
+    def pending(self):
+        return [row[0] for row in self.db.execute("SELECT url FROM pending ORDER BY id")]
+
+    def add_game(self, game):
+        self.add_many(game_image_urls(game))
+
+    def add_roster(self, players):
+        self.add_many(roster_image_urls(players))
+
+    def _extension(self, url, content_type):
+        content_type = (content_type or '').split(';')[0].strip()
+        extension = mimetypes.guess_extension(content_type) if content_type else None
+        if extension is None:
+            extension = os.path.splitext(urlsplit(url).path)[1].lower() or None
+        return extension or DEFAULT_EXTENSION
+
+    # stream one image into the store, returns (url, hash, filename, size)
+    def _fetch(self, url):
+        with self.session.get(url, stream=True) as res:
+            if res.status_code != 200:
+                raise IOError(f"status code {res.status_code}")
+
+            digest = hashlib.sha256()
+            size = 0
+            # hashed while written, the name is only known at the end
+            fd, partial = tempfile.mkstemp(dir=self.root, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as fh:
+                    for chunk in res.iter_content(CHUNK_SIZE):
+                        digest.update(chunk)
+                        fh.write(chunk)
+                        size += len(chunk)
+
+                image_hash = digest.hexdigest()
+                filename = os.path.join(
+                    image_hash[:2], image_hash + self._extension(url, res.headers.get('Content-Type')))
+                target = os.path.join(self.root, filename)
+                if os.path.exists(target):
+                    # same image under another url
+                    os.remove(partial)
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(partial, target)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+        return url, image_hash, filename, size
+
+    # download every pending url not in the store yet, returns {url: path}
+    # of all the pending urls stored
+    def download(self):
+        paths = {}
+        urls = []
+        for url in self.pending():
+            path = self.path(url)
+            if path is None:
+                urls.append(url)
+            else:
+                paths[url] = path
+        skipped = len(paths)
+        self.metrics.inc('images_skipped_total', skipped)
+        with self.db:
+            self.db.executemany("DELETE FROM pending WHERE url = ?", [(url,) for url in paths])
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self._fetch, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    url, image_hash, filename, size = future.result()
+                except Exception as e:
+                    # stays pending, tried again by the next download()
+                    log.error("image download failed", url=url, error=e)
+                    self.metrics.inc('images_failed_total')
+                    failed += 1
+                    continue
+                # the index is only written from this thread
+                with self.db:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO images (url, hash, filename, size, downloaded_at) VALUES (?, ?, ?, ?, ?)",
+                        (url, image_hash, filename, size, time.time()))
+                    self.db.execute("DELETE FROM pending WHERE url = ?", (url,))
+                self.metrics.inc('images_downloaded_total')
+                paths[url] = os.path.join(self.root, filename)
+        log.info("images downloaded", downloaded=len(urls) - failed,
+                 failed=failed, skipped=skipped)
+        return paths
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,250 @@
+"""
+    Name        : Instrumentation
+    Date        : 18-10-2026
+    Description : Leveled structured logging, timing spans and counters of a crawl.
+"""
+
+
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# logging.LoggerAdapter keyword arguments, everything else is a field
+_LOGGING_KWARGS = ('exc_info', 'stack_info', 'stacklevel', 'extra')
+
+
+class StructuredFormatter(logging.Formatter):
+    """`time level logger message key=value ...` lines, or with json_lines
+    one JSON object per record, ready for a log shipper."""
+
+    def __init__(self, json_lines=False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record):
+        fields = getattr(record, 'fields', {})
+        if self.json_lines:
+            data = {
+                'time': round(record.created, 3),
+                'level': record.levelname.lower(),
+                'logger': record.name,
+                'message': record.getMessage(),
+            }
+            data.update(fields)
+            if record.exc_info:
+                data['exception'] = self.formatException(record.exc_info)
+            return json.dumps(data, default=str)
+
+        line = "{} {:<7} {} {}".format(
+            self.formatTime(record, '%H:%M:%S'), record.levelname,
+            record.name, record.getMessage())
+        for key, value in fields.items():
+            line += f" {key}={value}"
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger taking the fields of an event as keyword arguments,
+    e.g log.warning("field not found", field='game_arena', url=url)."""
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs)
+                  if key not in _LOGGING_KWARGS}
+        kwargs['extra'] = dict(kwargs.get('extra') or {}, fields=fields)
+        return msg, kwargs
+
+
+def get_logger(name):
+    return StructuredLogger(logging.getLogger(name), {})
+
+
+def setup_logging(level='INFO', json_lines=False, stream=None):
+    """Send every log record to `stream` (stderr by default)."""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(StructuredFormatter(json_lines))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    return handler
+
+
+log = get_logger(__name__)
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+class Metrics:
+    """Counters and timings of a crawl, safe to update from many threads.
+
+    Counters and timings are keyed by a name and labels, e.g
+    inc('http_requests_total', status=200). span() times a phase (fetch,
+    parse, extract, write) of a game or tab, adds it to the phase's timing
+    and logs it at debug level with the game url, so the totals show where
+    the seconds go and the debug log shows it for every single game. Time
+    spent in a nested span is only counted for the inner one.
+
+    Worker processes record into their own Metrics and send snapshot() back
+    with their results, merge() adds them to the parent's.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        # (name, labels) -> [count, total seconds, max seconds]
+        self.timings = {}
+        # time taken by the nested spans of the open ones, per thread
+        self.local = threading.local()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            timing = self.timings.setdefault(key, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    @contextmanager
+    def span(self, phase, url=None, **labels):
+        stack = self.local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - start
+            elapsed = total - stack.pop()
+            if stack:
+                stack[-1] += total
+            self.observe('span_seconds', elapsed, phase=phase, **labels)
+            log.debug("span", phase=phase, url=url,
+                      ms=round(elapsed * 1000, 3), **labels)
+
+    def counter(self, name, **labels):
+        return self.counters.get((name, _labels(labels)), 0)
+
+    # plain, picklable copy of the metrics
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [(name, labels, value)
+                             for (name, labels), value in self.counters.items()],
+                'timings': [(name, labels, list(timing))
+                            for (name, labels), timing in self.timings.items()],
+            }
+
+    def merge(self, snapshot):
+        if not snapshot:
+            return
+        with self.lock:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, (count, total, longest) in snapshot['timings']:
+                timing = self.timings.setdefault(
+                    (name, tuple(map(tuple, labels))), [0, 0.0, 0.0])
+                timing[0] += count
+                timing[1] += total
+                timing[2] = max(timing[2], longest)
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.timings = {}
+
+    def summary(self):
+        snapshot = self.snapshot()
+        counters = {}
+        for name, labels, value in sorted(snapshot['counters']):
+            counters.setdefault(name, []).append(
+                {'labels': dict(labels), 'value': value})
+        timings = {}
+        for name, labels, (count, total, longest) in sorted(snapshot['timings']):
+            timings.setdefault(name, []).append({
+                'labels': dict(labels),
+                'count': count,
+                'total_seconds': round(total, 6),
+                'mean_ms': round(total / count * 1000, 3) if count else 0,
+                'max_ms': round(longest * 1000, 3),
+            })
+        return {'counters': counters, 'timings': timings}
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    # Prometheus text exposition format, for the node exporter textfile collector
+    def to_prometheus(self, prefix='scrapper_'):
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for name, labels, value in sorted(snapshot['counters']):
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_prometheus_labels(labels)} {value}")
+        timings = sorted(snapshot['timings'])
+        for name in sorted({timing[0] for timing in timings}):
+            metric = prefix + name
+            lines.append(f"# TYPE {metric} summary")
+            for _, labels, (count, total, _) in [t for t in timings if t[0] == name]:
+                lines.append(f"{metric}_count{_prometheus_labels(labels)} {count}")
+                lines.append(f"{metric}_sum{_prometheus_labels(labels)} {total:.6f}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for _, labels, (_, _, longest) in [t for t in timings if t[0] == name]:
+                lines.append(f"{metric}_max{_prometheus_labels(labels)} {longest:.6f}")
+        return '\n'.join(lines) + '\n'
+
+    # .prom files get the Prometheus text format, anything else JSON
+    def write(self, filename):
+        text = self.to_prometheus() if filename.endswith('.prom') else self.to_json()
+        # written next to the target and renamed so scrapers never see half a file
+        partial = filename + '.part'
+        with open(partial, 'w') as fh:
+            fh.write(text)
+        os.replace(partial, filename)
+
+
+# metrics of this process
+metrics = Metrics()
+
+
+# resident memory of this process in bytes. Where /proc is missing the
+# peak is the best there is
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # kilobytes on linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def get_metrics():
+    """Return the metrics of this process."""
+    return metrics
@@ -0,0 +1,162 @@
+"""
+    Name        : Crawl Manifest
+    Date        : 18-10-2026
+    Description : SQLite record of crawled games so interrupted crawls can resume.
+"""
+
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from paths import make_parent
+
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+# stable hash of the records extracted from a game
+def fingerprint(game):
+    data = json.dumps(game, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class CrawlManifest:
+    """Status of every game url and tab of a crawl.
+
+    A game is only marked done together with the size of every append-only
+    output file after its rows were flushed, in one transaction. On restart
+    restore_outputs() cuts the files back to those sizes, so rows of a game
+    that was being written when the crawl died are dropped instead of being
+    duplicated by the retry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        make_parent(path)
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS games (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                fingerprint TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tabs (
+                url TEXT NOT NULL,
+                tab TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (url, tab)
+            );
+            CREATE TABLE IF NOT EXISTS outputs (
+                filename TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+        """)
+        self.db.commit()
+
+    def status(self, url):
+        row = self.db.execute(
+            "SELECT status FROM games WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    # done, and with every one of `tabs` (e.g tabs_for(outputs)) fetched.
+    # A game done by a run building fewer outputs is crawled again for
+    # the tabs it is missing
+    def is_done(self, url, tabs=None):
+        if self.status(url) != DONE:
+            return False
+        return not tabs or set(tabs) <= self.done_tabs(url)
+
+    # urls still to crawl, in the order given, see is_done
+    def pending(self, urls, tabs=None):
+        done = {row[0] for row in self.db.execute(
+            "SELECT url FROM games WHERE status = ?", (DONE,))}
+        if tabs:
+            # only games with every tab fetched, the others miss one
+            tabs = set(tabs)
+            done &= {url for url, count in self.db.execute(
+                "SELECT url, COUNT(*) FROM tabs WHERE status = ? AND tab IN ({}) GROUP BY url"
+                .format(', '.join('?' * len(tabs))), (DONE, *tabs)) if count == len(tabs)}
+        for url in urls:
+            if url not in done:
+                yield url
+
+    def done_tabs(self, url):
+        return {row[0] for row in self.db.execute(
+            "SELECT tab FROM tabs WHERE url = ? AND status = ?", (url, DONE))}
+
+    def failed_tabs(self, url):
+        return [row[0] for row in self.db.execute(
+            "SELECT tab FROM tabs WHERE url = ? AND status = ?", (url, FAILED))]
+
+    def _record_tabs(self, url, tabs, now):
+        for tab, ok in tabs.items():
+            self.db.execute("""
+                INSERT INTO tabs (url, tab, status, attempts, updated_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (url, tab) DO UPDATE SET
+                    status = excluded.status, attempts = attempts + 1, updated_at = excluded.updated_at
+                """, (url, tab, DONE if ok else FAILED, now))
+
+    def _record_game(self, url, status, game_fingerprint, error, now):
+        self.db.execute("""
+            INSERT INTO games (url, status, attempts, fingerprint, error, updated_at) VALUES (?, ?, 1, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                status = excluded.status, attempts = attempts + 1,
+                fingerprint = excluded.fingerprint, error = excluded.error,
+                updated_at = excluded.updated_at
+            """, (url, status, game_fingerprint, error, now))
+
+    # the game's rows are flushed, outputs maps each output file to its size
+    def complete(self, url, game_fingerprint, tabs=None, outputs=None):
+        now = time.time()
+        with self.db:
+            self._record_tabs(url, tabs or {}, now)
+            self._record_game(url, DONE, game_fingerprint, None, now)
+            for filename, size in (outputs or {}).items():
+                self.db.execute(
+                    "INSERT OR REPLACE INTO outputs (filename, size) VALUES (?, ?)", (filename, size))
+
+    # only the failed tabs are recorded, a tab marked done always had its
+    # rows saved (see scrapper.saved_outputs)
+    def fail(self, url, error=None, tabs=None):
+        now = time.time()
+        with self.db:
+            self._record_tabs(url, {tab: ok for tab, ok in (tabs or {}).items() if not ok}, now)
+            self._record_game(url, FAILED, None, error, now)
+
+    # cut output files back to their last committed size, call before
+    # opening the writers
+    def restore_outputs(self, filenames):
+        restored = []
+        with self.db:
+            for filename in filenames:
+                size = os.path.getsize(filename) if os.path.exists(filename) else 0
+                row = self.db.execute(
+                    "SELECT size FROM outputs WHERE filename = ?", (filename,)).fetchone()
+                if row is None:
+                    # first crawl writing this file, what is there is committed
+                    self.db.execute(
+                        "INSERT INTO outputs (filename, size) VALUES (?, ?)", (filename, size))
+                elif size > row[0]:
+                    with open(filename, 'r+b') as fh:
+                        fh.truncate(row[0])
+                    restored.append(filename)
+        return restored
+
+    def summary(self):
+        return dict(self.db.execute(
+            "SELECT status, COUNT(*) FROM games GROUP BY status").fetchall())
+
+    def close(self):
+        self.db.close()
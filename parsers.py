@@ -0,0 +1,272 @@
+"""
+    Name        : Parser Backends
+    Date        : 18-10-2026
+    Description : Interchangeable HTML parser backends used by the extractors.
+"""
+
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml  # noqa: F401, only needed as the BeautifulSoup tree builder
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+
+DEFAULT_PARSER = 'html.parser'
+
+
+class ParserBackend:
+    """Turns a response payload into a document the get_* methods can walk.
+
+    Documents answer the subset of the BeautifulSoup API the extractors use:
+    find(name, attrs), find_all(name, attrs), .text, element[attr],
+    element.get(attr) and str(element).
+    """
+    name = None
+
+    def parse(self, content):
+        raise NotImplementedError
+
+    def index(self, soup):
+        """Class / data-* lookup table of a parsed document."""
+        return ElementIndex(soup)
+
+    # free a document nothing will read again. BeautifulSoup trees are
+    # full of reference cycles, taken apart they are freed right away
+    # instead of waiting for the garbage collector. decompose() follows
+    # next_element from where it is called, the document itself isn't
+    # linked to its first element so its children go one by one. Strings
+    # (text, doctype) only have decompose() from bs4 4.13 on, taken out of
+    # the tree they hold nothing else
+    def release(self, soup):
+        for child in list(soup.contents):
+            if isinstance(child, Tag):
+                child.decompose()
+            else:
+                child.extract()
+        soup.decompose()
+
+
+class HtmlParserBackend(ParserBackend):
+    """BeautifulSoup with the pure Python html.parser, always available."""
+    name = 'html.parser'
+
+    def parse(self, content):
+        return BeautifulSoup(content, 'html.parser')
+
+
+class LxmlBackend(ParserBackend):
+    """BeautifulSoup with the lxml tree builder."""
+    name = 'lxml'
+
+    def __init__(self):
+        if lxml is None:
+            raise ImportError("the lxml parser needs lxml (pip install lxml)")
+
+    def parse(self, content):
+        return BeautifulSoup(content, 'lxml')
+
+
+class SelectolaxBackend(ParserBackend):
+    """selectolax (lexbor) documents wrapped in a BeautifulSoup like API."""
+    name = 'selectolax'
+
+    def __init__(self):
+        if SelectolaxParser is None:
+            raise ImportError(
+                "the selectolax parser needs selectolax (pip install selectolax)")
+
+    def parse(self, content):
+        if content is None:
+            content = ''
+        return SelectolaxElement(SelectolaxParser(content).root)
+
+    # lexbor matches selectors natively, walking the tree from Python
+    # to build an ElementIndex would only be slower
+    def index(self, soup):
+        return SelectorIndex(soup)
+
+    # the lexbor tree lives outside the Python heap and goes with its
+    # parser object, there are no cycles to break
+    def release(self, soup):
+        pass
+
+
+# css selector equivalent to BeautifulSoup's find(name, attrs)
+def to_selector(name=None, attrs=None):
+    selector = name if isinstance(name, str) else '*'
+    for attr, value in (attrs or {}).items():
+        if value is True:
+            selector += f'[{attr}]'
+        elif attr == 'class':
+            # like BeautifulSoup, match one class out of the class list
+            selector += f'[class~="{value}"]'
+        else:
+            selector += f'[{attr}="{value}"]'
+    return selector
+
+
+class SelectolaxElement:
+    """A selectolax node answering the BeautifulSoup calls of the extractors."""
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def attrs(self):
+        return dict(self.node.attributes)
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+    def get_text(self):
+        return self.text
+
+    def get(self, attr, default=None):
+        value = self.node.attributes.get(attr, default)
+        return default if value is None else value
+
+    def __getitem__(self, attr):
+        value = self.node.attributes[attr]
+        return '' if value is None else value
+
+    def find(self, name=None, attrs=None):
+        node = self.node.css_first(to_selector(name, attrs))
+        return SelectolaxElement(node) if node is not None else None
+
+    def find_all(self, name=None, attrs=None):
+        return [SelectolaxElement(node) for node in self.node.css(to_selector(name, attrs))]
+
+    # elements matching a css selector (or a selector list), in document order
+    def select(self, selector):
+        return [SelectolaxElement(node) for node in self.node.css(selector)]
+
+    def decompose(self):
+        self.node.decompose()
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        return self.node.html or ''
+
+
+class ElementIndex:
+    """Elements of a document by class name and data-* attribute.
+
+    The document is walked once when the index is built, lookups after that
+    are dict accesses, so getting many fields out of a page costs one
+    traversal instead of one per field.
+    """
+
+    def __init__(self, soup):
+        self.classes = {}
+        self.data = {}
+        # document position of every element, by id
+        self.positions = {}
+        for position, element in enumerate(soup.find_all(True)):
+            self.positions[id(element)] = position
+            attrs = element.attrs
+            classes = attrs.get('class') or []
+            if isinstance(classes, str):
+                classes = classes.split()
+            for name in classes:
+                self.classes.setdefault(name, []).append(element)
+            for attr, value in attrs.items():
+                if attr.startswith('data-'):
+                    self.data.setdefault((attr, value), []).append(element)
+
+    def find_all(self, name=None, class_=None):
+        """Elements with the class (and tag name when given) in document order."""
+        elements = self.classes.get(class_, [])
+        if name is None:
+            return list(elements)
+        return [element for element in elements if element.name == name]
+
+    def find_all_any(self, name=None, classes=()):
+        """Elements with any of the classes, in document order."""
+        found = {}
+        for class_ in classes:
+            for element in self.find_all(name, class_):
+                found[id(element)] = element
+        return [found[key] for key in sorted(found, key=self.positions.__getitem__)]
+
+    def find(self, name=None, class_=None):
+        for element in self.classes.get(class_, []):
+            if name is None or element.name == name:
+                return element
+        return None
+
+    def find_data(self, name=None, attr=None, value=None):
+        for element in self.data.get((attr, value), []):
+            if name is None or element.name == name:
+                return element
+        return None
+
+
+class SelectorIndex:
+    """ElementIndex lookups answered by a selectolax document's css engine."""
+
+    def __init__(self, soup):
+        self.soup = soup
+
+    def find_all(self, name=None, class_=None):
+        return self.soup.find_all(name, {'class': class_})
+
+    def find_all_any(self, name=None, classes=()):
+        return self.soup.select(', '.join(
+            to_selector(name, {'class': class_}) for class_ in classes))
+
+    def find(self, name=None, class_=None):
+        return self.soup.find(name, {'class': class_})
+
+    def find_data(self, name=None, attr=None, value=None):
+        return self.soup.find(name, {attr: value})
+
+
+PARSERS = {
+    HtmlParserBackend.name: HtmlParserBackend,
+    LxmlBackend.name: LxmlBackend,
+    SelectolaxBackend.name: SelectolaxBackend,
+}
+
+
+def available_parsers():
+    """Names of the backends whose dependencies are installed."""
+    names = [HtmlParserBackend.name]
+    if lxml is not None:
+        names.append(LxmlBackend.name)
+    if SelectolaxParser is not None:
+        names.append(SelectolaxBackend.name)
+    return names
+
+
+def fastest_parser():
+    """Name of the fastest installed backend."""
+    return available_parsers()[-1]
+
+
+def get_parser(parser=None):
+    """Backend by name (or an already built backend), html.parser by default."""
+    if parser is None:
+        parser = DEFAULT_PARSER
+    if isinstance(parser, ParserBackend):
+        return parser
+    if parser not in PARSERS:
+        raise ValueError(f"parser must be one of {list(PARSERS)}")
+    return PARSERS[parser]()
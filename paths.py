@@ -0,0 +1,16 @@
+"""
+    Name        : Paths
+    Date        : 18-10-2026
+    Description : File system helpers shared by the stores and writers.
+"""
+
+
+import os
+
+
+# create the folder a file goes in, a bare filename needs none. Workers
+# sharing a disk may create it at the same time
+def make_parent(filename):
+    folder = os.path.dirname(filename)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
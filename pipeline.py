@@ -0,0 +1,125 @@
+"""
+    Name        : Crawl Pipeline
+    Date        : 18-10-2026
+    Description : Two stage crawl, async fetching feeding a process pool of parsers.
+"""
+
+
+import asyncio
+import gc
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from crawler import iterate
+from instrumentation import get_logger, get_metrics, rss_bytes
+from scrapper import extract_game
+
+
+log = get_logger(__name__)
+
+
+# marks the end of the fetched games
+_DONE = object()
+
+# seconds between memory checks while intake is throttled
+THROTTLE_INTERVAL = 0.1
+
+
+class Pipeline:
+    """Fetch games with a crawler and parse them on every core.
+
+    The crawler's raw `(url, page, tabs)` tuples go into a queue holding at
+    most `queue_size` games, when the parsers fall behind the crawler waits
+    for room so memory stays bounded. `workers` processes (one per core by
+    default) run scrapper.extract_game on them and the plain records come
+    back in completion order. The timings and counters the workers record
+    for a game are merged into `metrics`.
+
+    With an `rss_budget` (bytes) no new game is taken from the crawler
+    while this process is over budget and games are still queued, the
+    parsers drain the queue first. The crawler waits meanwhile, so memory
+    stops growing instead of the crawl running ahead.
+    """
+
+    def __init__(self, crawler, workers=None, queue_size=None, parser=None, metrics=None,
+                 outputs=None, rss_budget=None):
+        self.crawler = crawler
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.workers * 2
+        self.parser = parser
+        # outputs extracted from every game, all of them by default
+        self.outputs = outputs
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self.rss_budget = rss_budget
+        self.budget_warned = False
+
+    # wait while over the memory budget, as long as waiting can help
+    async def throttle(self, fetched):
+        if not self.rss_budget or rss_bytes() <= self.rss_budget:
+            return
+        self.metrics.inc('intake_throttled_total')
+        log.debug("over memory budget", rss=rss_bytes(), budget=self.rss_budget,
+                  queued=fetched.qsize())
+        while not fetched.empty() and rss_bytes() > self.rss_budget:
+            await asyncio.sleep(THROTTLE_INTERVAL)
+        if rss_bytes() > self.rss_budget:
+            # nothing queued is left to free, what remains is garbage or
+            # memory the allocator keeps
+            gc.collect()
+            if rss_bytes() > self.rss_budget and not self.budget_warned:
+                self.budget_warned = True
+                log.warning("memory budget exceeded with nothing queued",
+                            rss=rss_bytes(), budget=self.rss_budget)
+
+    async def process(self, urls):
+        loop = asyncio.get_running_loop()
+        fetched = asyncio.Queue(maxsize=self.queue_size)
+        parsed = asyncio.Queue(maxsize=self.workers)
+
+        async def fetch():
+            try:
+                async for url, page, tabs in self.crawler.crawl(urls):
+                    await self.throttle(fetched)
+                    await fetched.put((url, page, tabs))
+            except Exception as e:
+                log.error("fetching games failed", error=e)
+            for _ in range(self.workers):
+                await fetched.put(_DONE)
+
+        async def parse(pool):
+            while True:
+                item = await fetched.get()
+                if item is _DONE:
+                    break
+                url, page, tabs = item
+                try:
+                    game = await loop.run_in_executor(
+                        pool, extract_game, url, page, tabs, self.parser, self.outputs)
+                except Exception as e:
+                    log.error("extraction failed", url=url, error=e)
+                    self.metrics.inc('extraction_errors_total')
+                    continue
+                self.metrics.merge(game.pop('metrics', None))
+                await parsed.put(game)
+            await parsed.put(_DONE)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            tasks = [asyncio.ensure_future(fetch())]
+            tasks += [asyncio.ensure_future(parse(pool))
+                      for _ in range(self.workers)]
+            try:
+                finished = 0
+                while finished < self.workers:
+                    game = await parsed.get()
+                    if game is _DONE:
+                        finished += 1
+                    else:
+                        yield game
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    # blocking generator of extracted games
+    def run(self, urls):
+        return iterate(self.process(urls))
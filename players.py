@@ -0,0 +1,101 @@
+"""
+    Name        : Player Table
+    Date        : 18-10-2026
+    Description : Deduplicated players of many rosters with the competitions they played in.
+"""
+
+
+import csv
+import os
+
+from paths import make_parent
+
+
+# columns of the player table, a player's competitions are ; separated
+PLAYER_FIELDS = [
+    'first_name', 'last_name', 'dob', 'team', 'jersey_number', 'position',
+    'height', 'player_img', 'competitions',
+]
+
+COMPETITION_SEPARATOR = ';'
+
+
+# identity of a player across rosters
+def player_key(player):
+    return (
+        player.get('first_name', '').strip().lower(),
+        player.get('last_name', '').strip().lower(),
+        player.get('dob', '').strip(),
+        player.get('team', '').strip().lower(),
+    )
+
+
+class PlayerTable:
+    """One row per player (name + date of birth + team) out of any number of
+    rosters.
+
+    merge() adds the players of a roster (see RosterScrapper.parse_roster),
+    a player already in the table only gets the roster's competition added
+    to its competitions, and its other fields updated from the latest
+    roster. A table loaded from a csv file keeps growing across runs
+    without duplicating anyone.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.players = {}
+        if filename and os.path.exists(filename):
+            self.load(filename)
+
+    def __len__(self):
+        return len(self.players)
+
+    def __iter__(self):
+        return iter(self.players.values())
+
+    def _add(self, player, competitions):
+        key = player_key(player)
+        row = self.players.get(key)
+        if row is None:
+            row = self.players[key] = {field: '' for field in PLAYER_FIELDS}
+            row['competitions'] = []
+        for field in PLAYER_FIELDS:
+            if field != 'competitions' and player.get(field):
+                row[field] = player[field]
+        for competition in competitions:
+            if competition and competition not in row['competitions']:
+                row['competitions'].append(competition)
+        return row
+
+    def merge(self, players):
+        for player in players:
+            self._add(player, [player.get('competition')])
+
+    def get(self, first_name, last_name, dob, team):
+        return self.players.get(player_key({
+            'first_name': first_name, 'last_name': last_name,
+            'dob': dob, 'team': team}))
+
+    def load(self, filename):
+        with open(filename, 'r', newline='') as fh:
+            for row in csv.DictReader(fh):
+                competitions = (row.get('competitions') or '').split(COMPETITION_SEPARATOR)
+                self._add(row, competitions)
+
+    def rows(self):
+        for row in self.players.values():
+            yield dict(row, competitions=COMPETITION_SEPARATOR.join(row['competitions']))
+
+    # the whole table is rewritten, renamed into place once complete
+    def save(self, filename=None):
+        filename = filename or self.filename
+        if filename is None:
+            raise ValueError("Filename must be provided.")
+        make_parent(filename)
+
+        partial = filename + '.part'
+        with open(partial, 'w', newline='') as fh:
+            writer = csv.DictWriter(fh, fieldnames=PLAYER_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.rows())
+        os.replace(partial, filename)
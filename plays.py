@@ -0,0 +1,138 @@
+"""
+    Name        : Play By Play
+    Date        : 18-10-2026
+    Description : Compact typed play by play events, parsed from the actions list in one pass.
+"""
+
+
+import sys
+
+from converters import to_int, to_period, to_seconds
+
+
+# classes of the actions of each team in the play by play tab
+TEAM_CLASSES = {'x--team-A': 'A', 'x--team-B': 'B'}
+
+# athlete name of actions without a player (technical fouls of the bench)
+COACH = 'Coach'
+
+
+class PlayEvent:
+    """One action of the play by play.
+
+    Numbers are ints (None when the page had no valid value): `event` is
+    the position in the game starting at 1, `period` 1-4 for the quarters
+    and 5+ for overtimes, `clock_seconds` the clock shown on the page,
+    `team_score` / `opp_score` the scores of the acting team and of its
+    opponent after the action. `team` is 'A' or 'B'. The page's own text
+    of the period, clock and scores is kept next to the numbers
+    (`quarter`, `time`, `team_points`, `opp_points`), the csv rows are
+    written from it as shown, e.g 'OT' and '3:47' or a clock with tenths.
+    Strings are interned, every action of a player shares one name.
+    """
+    __slots__ = ('event', 'team', 'period', 'clock_seconds', 'athlete_name',
+                 'description', 'team_score', 'opp_score', 'athlete_image',
+                 'quarter', 'time', 'team_points', 'opp_points')
+
+    def __init__(self, event, team, period, clock_seconds, athlete_name,
+                 description, team_score, opp_score, athlete_image,
+                 quarter='', time='', team_points='', opp_points=''):
+        self.event = event
+        self.team = team
+        self.period = period
+        self.clock_seconds = clock_seconds
+        self.athlete_name = athlete_name
+        self.description = description
+        self.team_score = team_score
+        self.opp_score = opp_score
+        self.athlete_image = athlete_image
+        self.quarter = quarter
+        self.time = time
+        self.team_points = team_points
+        self.opp_points = opp_points
+
+    def values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, PlayEvent) and self.values() == other.values()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"PlayEvent({fields})"
+
+    # pickled as a plain tuple, events cross process boundaries by the thousand
+    def __reduce__(self):
+        return PlayEvent, self.values()
+
+    # csv row of the event, see scrapper.PLAY_BY_PLAY_FIELDS
+    def to_dict(self, team_names=('', '')):
+        names = dict(zip('AB', team_names))
+        return {
+            'team': names[self.team],
+            'quarter': self.quarter,
+            'time': self.time,
+            'athlete_name': self.athlete_name,
+            'description': self.description,
+            'opponent': names['B' if self.team == 'A' else 'A'],
+            'team_score': self.team_points,
+            'opp_score': self.opp_points,
+            'athlete_image': self.athlete_image,
+        }
+
+
+def _text(element, name, class_):
+    found = element.find(name, {'class': class_})
+    return found.text.strip() if found is not None else ''
+
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+
+# team ('A' or 'B') of an action element, None for anything else
+def action_team(element):
+    classes = element.get('class') or []
+    if isinstance(classes, str):
+        classes = classes.split()
+    for name in classes:
+        if name in TEAM_CLASSES:
+            return TEAM_CLASSES[name]
+    return None
+
+
+def parse_action(element, event, team=None):
+    """PlayEvent of one `li.x--team-*` action element."""
+    if team is None:
+        team = action_team(element)
+
+    athlete = element.find('span', {'class': 'athlete-name'})
+    if athlete is None:
+        # technical fouls are counted as rebs for coaches
+        athlete_name = COACH
+        image = element.find('div', {'class': 'action-scores'}).find(
+            'img', {'class': 'nat-flag'})
+    else:
+        athlete_name = athlete.text.strip()
+        image = element.find('div', {'class': 'athlete-info'}).find('img')
+
+    quarter = _text(element, 'span', 'period')
+    time = _text(element, 'span', 'time')
+    scores = element.find('div', {'class': 'score-info'}).find_all('span')
+    team_points = scores[0].text.strip()
+    opp_points = scores[1].text.strip()
+    return PlayEvent(
+        event=event,
+        team=team,
+        period=to_period(quarter),
+        clock_seconds=to_seconds(time),
+        athlete_name=_intern(athlete_name),
+        description=_intern(_text(element, 'span', 'action-description')),
+        team_score=to_int(team_points),
+        opp_score=to_int(opp_points),
+        athlete_image=_intern(image['src']) if image is not None else 'unknown',
+        quarter=_intern(quarter),
+        time=_intern(time),
+        team_points=_intern(team_points),
+        opp_points=_intern(opp_points),
+    )
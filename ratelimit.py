@@ -0,0 +1,149 @@
+"""
+    Name        : Rate Limiter
+    Date        : 18-10-2026
+    Description : Adaptive per-host token bucket rate limiting for the scrappers.
+"""
+
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+# status codes telling us the server wants us to slow down
+BACKOFF_STATUS_CODES = (429, 503)
+
+
+class TokenBucket:
+    """Classic token bucket, `rate` tokens per second up to `burst` tokens."""
+
+    def __init__(self, rate, burst):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # no tokens are handed out before this time (server asked us to wait)
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens +
+                          (now - self.updated) * self.rate)
+        self.updated = now
+
+    # take a token, returns how long the caller has to wait for it
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = 0
+            if self.tokens < 0:
+                wait = -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def block(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until,
+                                     time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Token bucket per host which adapts to how the server is doing.
+
+    Rates go down multiplicatively when the server answers 429/503 or gets
+    slower than `slow_factor` times its usual latency (and over `slow_after`
+    seconds, so jitter on fast responses is ignored), and creep back up
+    after `recover_after` healthy responses in a row, never going over
+    `max_rate` or under `min_rate`.
+    """
+
+    def __init__(self, rate=2.0, burst=4, min_rate=0.2, max_rate=None,
+                 backoff=0.5, increase=1.25, recover_after=10, slow_factor=3.0,
+                 slow_after=1.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.backoff = backoff
+        self.increase = increase
+        self.recover_after = recover_after
+        self.slow_factor = slow_factor
+        self.slow_after = slow_after
+
+        self.buckets = {}
+        self.latency = {}
+        self.healthy = {}
+        self.lock = threading.Lock()
+
+    def _host(self, url):
+        return urlsplit(url).netloc.lower()
+
+    def bucket(self, url):
+        host = self._host(url)
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+                self.healthy[host] = 0
+            return self.buckets[host]
+
+    def acquire(self, url):
+        return self.bucket(url).acquire()
+
+    # feed back the outcome of a request made after acquire()
+    def update(self, url, status_code=None, elapsed=None, retry_after=None):
+        host = self._host(url)
+        bucket = self.bucket(url)
+
+        with self.lock:
+            slow = False
+            if elapsed is not None:
+                average = self.latency.get(host)
+                if average is None:
+                    self.latency[host] = elapsed
+                else:
+                    slow = elapsed > max(average * self.slow_factor,
+                                         self.slow_after)
+                    # exponential moving average of the latency
+                    self.latency[host] = average * 0.8 + elapsed * 0.2
+
+            if status_code is None or status_code in BACKOFF_STATUS_CODES or slow:
+                self.healthy[host] = 0
+                rate = max(self.min_rate, bucket.rate * self.backoff)
+            else:
+                self.healthy[host] += 1
+                rate = bucket.rate
+                if self.healthy[host] >= self.recover_after:
+                    self.healthy[host] = 0
+                    rate = min(self.max_rate, bucket.rate * self.increase)
+
+        if rate != bucket.rate:
+            bucket.set_rate(rate)
+        if retry_after:
+            bucket.block(retry_after)
+        return rate
+
+
+# seconds from a Retry-After header, None when missing or given as a date
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -0,0 +1,128 @@
+"""
+    Name        : Reprocess
+    Date        : 18-10-2026
+    Description : Rebuild the outputs from the raw archive on every core, without the network.
+"""
+
+
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import columnar
+from archive import RawArchive
+from instrumentation import get_logger, get_metrics, setup_logging
+from parsers import fastest_parser
+from scrapper import (OUTPUTS, close_writers, columnar_path, csv_outputs, extract_game,
+                      open_writers, save_game, tabs_for)
+
+
+log = get_logger(__name__)
+
+# games handed to a worker at a time
+CHUNK_SIZE = 8
+
+# archive of the worker process, opened once by _init_worker
+_archive = None
+_options = {}
+
+
+def _init_worker(archive_path, parser, outputs):
+    global _archive
+    _archive = RawArchive(archive_path, readonly=True)
+    _options.update(parser=parser, outputs=outputs)
+
+
+# one failing game must not stop the pool.map of the whole archive
+def _extract(game_url):
+    try:
+        url, page, tabs = _archive.read_game(game_url)
+        if page is None:
+            return {'error': 'game page not archived'}
+        return extract_game(url, page, tabs, _options['parser'], _options['outputs'])
+    except Exception as e:
+        return {'error': repr(e)}
+
+
+def reprocess(archive_path, data_path, workers=None, parser=None, outputs=None,
+              columnar_format=None, database=None):
+    """Extract every game of the archive again into fresh outputs in data_path.
+
+    Games are spread over `workers` processes (one per core by default),
+    each reading the archive on its own, and written in the order the games
+    were archived (see RawArchive.games) so two runs over the same archive
+    give the same files. Returns
+    the number of games written.
+    """
+    if not os.path.exists(archive_path):
+        raise FileNotFoundError(archive_path)
+    parser = parser or fastest_parser()
+    workers = workers or os.cpu_count() or 1
+    metrics = get_metrics()
+
+    with RawArchive(archive_path, readonly=True) as archive:
+        games = archive.games()
+    log.info("reprocessing", games=len(games), workers=workers, parser=parser)
+
+    # fresh outputs, never appended to the rows of an earlier run. Dataset
+    # partitions of games not in the archive would be read with the new ones
+    for filename in csv_outputs(data_path).values():
+        if os.path.exists(filename):
+            os.remove(filename)
+    if os.path.exists(columnar_path(data_path)):
+        shutil.rmtree(columnar_path(data_path))
+    writers = open_writers(data_path, columnar_format=columnar_format, database=database)
+
+    written = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(archive_path, parser, outputs)) as pool:
+            for game_url, game in zip(games, pool.map(_extract, games, chunksize=CHUNK_SIZE)):
+                if 'error' in game:
+                    log.error("extraction failed", url=game_url, error=game['error'])
+                    metrics.inc('extraction_errors_total')
+                    continue
+                metrics.merge(game.pop('metrics', None))
+                missing = [tab for tab, ok in game['tabs'].items() if not ok]
+                if missing:
+                    log.warning("missing tabs", url=game_url, tabs=missing)
+                    metrics.inc('games_failed_total')
+                    continue
+                save_game(game, writers, metrics)
+                metrics.inc('games_total')
+                written += 1
+    finally:
+        close_writers(writers)
+
+    elapsed = time.perf_counter() - start
+    log.info("reprocessed", games=written, seconds=round(elapsed, 3),
+             games_per_sec=round(written / elapsed, 3) if elapsed else None)
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--archive', default="final/raw/responses.warc")
+    parser.add_argument('--out', default="final/reprocessed/",
+                        help='folder of the new outputs')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--parser', default=None)
+    parser.add_argument('--outputs', default=','.join(OUTPUTS),
+                        help=f"comma separated, any of {','.join(OUTPUTS)}")
+    parser.add_argument('--database', default=None,
+                        help="sqlite database the games are upserted into as well")
+    args = parser.parse_args()
+
+    setup_logging(os.environ.get('SCRAPPER_LOG_LEVEL', 'INFO'),
+                  json_lines=os.environ.get('SCRAPPER_LOG_JSON') == '1')
+    outputs = args.outputs.split(',')
+    # unknown output names fail here, not in every worker
+    tabs_for(outputs)
+
+    reprocess(args.archive, args.out, workers=args.workers, parser=args.parser,
+              outputs=outputs, database=args.database,
+              columnar_format='parquet' if columnar.available() else None)
+    get_metrics().write(os.path.join(args.out, 'metrics.json'))
@@ -6,121 +6,310 @@
 """
 
 
-from bs4 import BeautifulSoup
-import requests
-
 import csv
+import html
 import shutil  # for saving image data
-from time import sleep
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from boxscore import TEAM_SECTIONS, parse_section, section_team
+from cache import ResponseCache
+from fields import Field, FieldSpec, attr
+from instrumentation import Metrics, get_logger, get_metrics, setup_logging
+from parsers import fastest_parser, get_parser
+from players import PlayerTable
+from plays import TEAM_CLASSES, parse_action
+from ratelimit import RateLimiter
+from session import create_session, get_session
+from writers import EXTRA_FIELD, CsvWriter
+
+
+log = get_logger(__name__)
+
+
+BASE_URL = 'https://www.fiba.basketball'
+
+# headers of the ajax requests made by the site
+AJAX_HEADERS = {
+    "Accept": "text/html, */*; q=0.01",
+    "User-Agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Mobile Safari/537.36",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "X-Requested-With": "XMLHttpRequest"
+}
+
+# tabs each output of a game is built from
+OUTPUT_TABS = {
+    'game_in_brief': ['preview', 'team_comparison'],
+    'boxscore': ['boxscore'],
+    'play_by_play': ['play_by_play'],
+}
+OUTPUTS = list(OUTPUT_TABS)
+
+
+# tabs to fetch for a run building only `outputs` (all of them by default)
+def tabs_for(outputs=None):
+    tabs = []
+    for output in (OUTPUTS if outputs is None else outputs):
+        if output not in OUTPUT_TABS:
+            raise ValueError(f"output must be one of {OUTPUTS}")
+        for tab in OUTPUT_TABS[output]:
+            if tab not in tabs:
+                tabs.append(tab)
+    return tabs
+
+
+# outputs (of `outputs`) whose tabs are all in `done_tabs`, e.g saved for a
+# game by an earlier run building fewer outputs
+def saved_outputs(done_tabs, outputs=None):
+    return [output for output in (OUTPUTS if outputs is None else outputs)
+            if all(tab in done_tabs for tab in OUTPUT_TABS[output])]
+
+
+# tabs needed to build the outputs of a single game
+GAME_TABS = tabs_for()
+
+# output schemas, the columns are fixed before the first row is written
+GAME_IN_BRIEF_FIELDS = [
+    'date', 'time', 'arena', 'city_or_country', 'phase', 'group', 'tournament',
+    'team', 'opponent', 'final_score', 'result', 'top_performer', 'top_performer_img',
+    'Q1', 'Q2', 'Q3', 'Q4', 'OT1', 'OT2', 'OT3',
+    'points_from_turnover', 'second_chance_points', 'fast_break_points',
+    'points_in_the_paint', 'points_from_the_bench',
+    'biggest_lead', 'biggest_scoring_run', 'times_leading',
+]
+PLAY_BY_PLAY_FIELDS = [
+    'game_url', 'team', 'quarter', 'time', 'athlete_name', 'description',
+    'opponent', 'team_score', 'opp_score', 'athlete_image',
+]
+BOXSCORE_FIELDS = [
+    'game_url', 'team', 'opponent', 'jersey_number', 'player_name', 'totals', 'played',
+    'seconds_played', 'points', 'fg_made', 'fg_attempted', 'two_made', 'two_attempted',
+    'three_made', 'three_attempted', 'ft_made', 'ft_attempted', 'off_rebounds',
+    'def_rebounds', 'rebounds', 'assists', 'fouls', 'turnovers', 'steals', 'blocks',
+    'plus_minus', 'efficiency',
+]
+ROSTER_FIELDS = [
+    'jersey_number', 'first_name', 'last_name', 'position', 'height',
+    'team', 'dob', 'competition', 'player_img',
+]
+
+# single value fields of the game page and the preview tab. Each page is
+# read in one go, a markup change is a change of path here. Per team
+# fields ({team} in the path) are read for A and B
+GAME_FIELDS = FieldSpec([
+    Field('date', 'preview', 'div.date_infos div.date'),
+    Field('time', 'preview', ['div.date_infos div.time', 'span.timezone?']),
+    Field('city_or_country', 'preview', 'div.date_infos span.country_name'),
+    Field('arena', 'preview', 'div.location'),
+    Field('phase', 'game', 'span.phase'),
+    Field('group', 'game', 'span.group'),
+    Field('team_name', 'game', 'div.team-{team} span.team-name'),
+    Field('final_score', 'game', 'div.final-score span.score-{team}'),
+    Field('top_performer', 'game', 'div.athlete-{team} span.name'),
+    Field('top_performer_img', 'game', 'div.performer-content div.team-{team} img',
+          read=attr('src')),
+])
+
+# how long cached responses stay fresh, first matching pattern wins.
+# Game pages and tabs only for a few minutes, a game not played yet or
+# still going changes. Once a game is extracted with its final score its
+# entries are pinned (ResponseCache.pin) and never fetched again.
+# Schedule pages are revalidated on every run (a 304 costs no download),
+# everything else after an hour.
+CACHE_TTL_RULES = [
+    (r'/game/', 10 * 60),
+    (r'/(schedule|games|results)(/|$|\?)', 0),
+]
+CACHE_DEFAULT_TTL = 60 * 60
+
+
+# path segments of roster urls that come after the competition part,
+# e.g /basketballworldcup/2023/team/South-Sudan/roster
+ROSTER_URL_STOP = ('team', 'teams', 'roster', 'rosters', 'players')
+
+
+# competition of a roster url, 'basketballworldcup-2023' in the example above
+def competition_from_url(url):
+    parts = []
+    for part in urlsplit(url or '').path.split('/'):
+        if not part:
+            continue
+        if part.lower() in ROSTER_URL_STOP:
+            break
+        parts.append(part)
+    return '-'.join(parts).lower() or None
+
+
+# site relative links (e.g the urls of games-links.csv) prefixed with the
+# base url, absolute and protocol relative ones are left as they are
+def absolute_url(url, base_url=BASE_URL):
+    if url.startswith('/') and not url.startswith('//'):
+        return base_url + url
+    return url
+
+
+# tournament of a game url, e.g fiba-afrobasket-2021-pre-qualifiers
+def tournament_from_url(url):
+    return ("FIBA-" + "-".join(url.split("/")[3:6])).lower()
 
 
 class RosterScrapper:
-    def __init__(self, url=None):
+    def __init__(self, url=None, session=None, parser=None, concurrency=8):
         self.url = url
+        self.session = session if session is not None else get_session()
+        self.parser = get_parser(parser)
+        self.concurrency = concurrency
         self.roster = []
-        self.headers = {
-            "Accept": "text/html, */*; q=0.01",
-            "User-Agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Mobile Safari/537.36",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-            "X-Requested-With": "XMLHttpRequest"
-        }
+        self.headers = dict(AJAX_HEADERS)
+        # roster csv writers by filename, open until close()
+        self.writers = {}
+
+    # name of the competition a roster page belongs to, from the page
+    # heading, then the page title, then the url
+    def get_competition(self, soup, url=None):
+        heading = soup.find(['h1', 'h2', 'div', 'span'], {'class': 'competition-name'})
+        if heading is not None and heading.text.strip():
+            return heading.text.strip()
+        title = soup.find('title')
+        if title is not None and ' - ' in title.text:
+            return title.text.rsplit(' - ', 1)[-1].strip()
+        return competition_from_url(url) or "Unknown"
+
+    # players of a roster page, without fetching anything
+    def parse_roster(self, content, url=None):
+        soup = self.parser.parse(content)
+        competition = self.get_competition(soup, url)
+
+        roster_container = soup.find_all(
+            'div', {'class': 'country_roster_team'})
+        if not roster_container:
+            return []
+        # the players' list, the staff comes first when both are shown
+        container = soup.find('div', {'class': 'players'})
+        if container is None:
+            container = roster_container[1] if len(roster_container) > 1 \
+                else roster_container[0]
+
+        players = []
+        for member in container.find_all('div', {'class': 'roster_member_container'}):
+            img = member.find('img')
+            players.append({
+                'jersey_number': member.find("div", {'class': 'num'}).text.strip(),
+                'first_name': member.find('div', {'class': 'firstname'}).text.strip(),
+                'last_name': member.find('div', {'class': 'lastname'}).text.strip(),
+                'position': member.find('div', {'class': 'position'}).text.strip(),
+                'height': member.find('div', {'class': 'height'}).text.strip(),
+                'team': member.find('div', {'class': 'team'}).text.strip(),
+                'dob': member.find('div', {'class': 'birth'}).text.strip(),
+                'competition': competition,
+                'player_img': img['src'] if img is not None else '',
+            })
+        return players
+
+    def fetch_roster(self, url):
+        res = self.session.get(url, headers=self.headers)
+        if res.status_code != 200:
+            log.error("roster fetch failed", url=url, status=res.status_code)
+            return []
+        return self.parse_roster(res.content, url)
 
     def get_roster(self, url=None):
         if url is None:
             raise ValueError("URL must be provided")
-
-        res = requests.get(url, headers=self.headers)
-        soup = None
-
-        if res.status_code == 200:
-            soup = BeautifulSoup(res.content, 'html.parser')
-            roster_container = soup.find_all(
-                'div', {'class': 'country_roster_team'})
-
-            members = []
-            if len(roster_container) > 1:
-                members = roster_container[1].find_all(
-                    'div', {'class': 'roster_member_container'})
-            else:
-                members = roster_container[0].find_all(
-                    'div', {'class': 'roster_member_container'})
-
-            for member in members:
-                player_img = ""
-                jersey_no = ""
-                first_name = "",
-                last_name = ""
-                position = ""
-                height = ""
-                team = ""
-                dob = ""
-                competition = "FIBA World Cup 2023"
-
-                player_img = member.find('img')['src']
-
-                jersey_no = member.find("div", {'class': 'num'}).text.strip()
-                first_name = member.find(
-                    'div', {'class': 'firstname'}).text.strip()
-                last_name = member.find(
-                    'div', {'class': 'lastname'}).text.strip()
-                position = member.find(
-                    'div', {'class': 'position'}).text.strip()
-                height = member.find('div', {'class': 'height'}).text.strip()
-                team = member.find('div', {'class': 'team'}).text.strip()
-                dob = member.find('div', {'class': 'birth'}).text.strip()
-
-                player = {
-                    'jersey_number': jersey_no,
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'position': position,
-                    'height': height,
-                    'team': team,
-                    'dob': dob,
-                    'competition': competition,
-                    'player_img': player_img,
-                }
-
-                self.roster.append(player)
-
-     # recieves a dict or list of dicts
-
+        players = self.fetch_roster(url)
+        self.roster.extend(players)
+        return players
+
+    # rosters of many teams / competitions, `concurrency` fetched at once.
+    # Players are merged into `table` (a new PlayerTable by default), and
+    # written to `writer` (a CsvWriter of ROSTER_FIELDS) as each roster comes in
+    def get_rosters(self, urls, table=None, writer=None):
+        if table is None:
+            table = PlayerTable()
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self.fetch_roster, url): url for url in urls}
+            for future in as_completed(futures):
+                try:
+                    players = future.result()
+                except Exception as e:
+                    log.error("roster fetch failed", url=futures[future], error=e)
+                    continue
+                self.roster.extend(players)
+                table.merge(players)
+                if writer is not None:
+                    writer.write_rows(players)
+        return table
+
+    # recieves a dict or list of dicts, see write_csv. The header is written
+    # when the file is new (`header` is only kept for older callers)
     def to_csv(self, data=None, filename=None, header=True):
         if filename is None:
             raise ValueError("Filename must be provided.")
         if data is None:
             raise ValueError("Data to be saved must be provided.")
+        if not isinstance(data, (list, dict)):
+            raise TypeError('data must be a dict or list of dicts')
 
-        headers = []
-        if header:
-            if isinstance(data, list):
-                headers = data[0].keys()
-            elif isinstance(data, dict):
-                headers = data.keys()
-            else:
-                raise TypeError('data must be a dict or list of dicts')
+        write_csv(self.writers, filename, data)
 
-        print(f'saving data to {filename}.......', end='')
-        with open(filename, 'a') as fh:
-            writer = csv.DictWriter(fh, fieldnames=headers)
-            if header:
-                writer.writeheader()
+    def close(self):
+        close_writers(self.writers)
+        self.writers = {}
 
-            if isinstance(data, list):
-                writer.writerows(data)
-            else:
-                writer.writerow(data)
-        fh.close()
-        print('done')
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameTabs:
+    """Ajax tabs of one game, each fetched and parsed on first access.
+
+    `contents` are payloads already fetched (by the crawler), other tabs are
+    requested with `fetch(tab)` the first time they are read. Without a
+    fetch function (offline extraction) they are simply missing. Payloads
+    and soups are kept for the rest of the game, a tab costs at most one
+    request and one parse.
+    """
+
+    def __init__(self, parse, fetch=None, contents=None):
+        self.parse = parse
+        self.fetch = fetch
+        self.contents = dict(contents or {})
+        self.soups = {}
+
+    def content(self, tab):
+        if tab not in self.contents:
+            self.contents[tab] = self.fetch(tab) if self.fetch else None
+        return self.contents[tab]
+
+    def soup(self, tab):
+        if tab not in self.soups:
+            content = self.content(tab)
+            self.soups[tab] = self.parse(tab, content) if content else None
+        return self.soups[tab]
+
+    def has(self, tab):
+        return bool(self.content(tab))
 
 
 class WebScrapper:
     first = True
 
-    def __init__(self):
+    def __init__(self, session=None, base_url=BASE_URL, parser=None, metrics=None):
         self.name = 'South Sudan Basketball Web Scraper'
+        self.base_url = base_url
+        # parser backend building the soups, see parsers.PARSERS
+        self.parser = get_parser(parser)
+        # shared pooled session, connections are reused across games
+        self.session = session if session is not None else get_session()
+        # timings and per field misses, the process metrics by default
+        self.metrics = metrics if metrics is not None else get_metrics()
         self.soup = None
         self.html = None
         self.game = {}
@@ -129,21 +318,22 @@ class WebScrapper:
         self.ajax_urls = {}
         self.comparison_data = None
         self.default_value = "Unknown"
-        self.headers = {
-            "Accept": "text/html, */*; q=0.01",
-            "User-Agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Mobile Safari/537.36",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-            "X-Requested-With": "XMLHttpRequest"
-        }
+        self.headers = dict(AJAX_HEADERS)
         self.allowed_tabs = ['preview', 'play_by_play', 'boxscore',
                              'videos', 'shot_chart', 'team_comparison']
 
         self.data = None
         self.cookies = None
-        print('*'*25)
-        print("Scrapper initialized")
-        print("*"*25)
+
+        # per game caches, cleared by load()
+        self.indexes = {}
+        self.memo = {}
+        # fields not found in the loaded game, see fields()
+        self.misses = []
+        self.tabs = GameTabs(self.parse_tab, self.fetch_tab)
+        # csv writers of to_csv by filename, open until close()
+        self.writers = {}
+        log.debug("scrapper initialized", parser=self.parser.name)
 
     def __str__(self):
         return f"{self.name}"
@@ -151,23 +341,102 @@ class WebScrapper:
     def init(self, url=None):
         if not url:
             raise ValueError("url must be provided")
-        self.game_url = url
-        print('fetching data...', end='')
-        result = requests.get(url, self.headers)
+        with self.metrics.span('fetch', url, tab='game'):
+            result = self.session.get(url)
         self.soup = None
-        print('done')
 
-        print('making soup...', end='')
-        self.soup = BeautifulSoup(result.content, 'html.parser')
-        print('done')
+        self.load(result.content, url)
 
-        # extra data urls
-        for tab in self.allowed_tabs:
+    # build the game soup from an already fetched page. `tabs` are the
+    # game's tab payloads when they were fetched already, no other tab is
+    # requested then. Otherwise tabs are fetched as the extractors need them
+    def load(self, content, url=None, tabs=None):
+        self.game_url = url
+        self.soup = None
+        self.indexes = {}
+        self.memo = {}
+        self.misses = []
+        self.ajax_urls = {}
+        self.comparison_data = None
+        with self.metrics.span('parse', url, tab='game'):
+            self.soup = self.parser.parse(content)
+        if tabs is None:
+            self.tabs = GameTabs(self.parse_tab, self.fetch_tab)
+        else:
+            self.tabs = GameTabs(self.parse_tab, contents=tabs)
+
+    # take the trees of the loaded game apart once everything is extracted.
+    # Extracted records are plain values, nothing points into the trees.
+    # Elements the caller still holds (e.g from get_boxscore) are emptied
+    def release(self):
+        soups = [self.soup, self.comparison_data, *self.tabs.soups.values()]
+        released = set()
+        for soup in soups:
+            if soup is not None and id(soup) not in released:
+                released.add(id(soup))
+                self.parser.release(soup)
+        self.soup = None
+        self.comparison_data = None
+        self.indexes = {}
+        self.memo = {}
+        # the tabs hold bound methods of this scrapper, a cycle of its own.
+        # load() sets up new ones
+        self.tabs = None
+
+    # request the payload of a tab of the loaded game
+    def fetch_tab(self, tab):
+        if tab not in self.ajax_urls:
             try:
-                url = self.get_ajax_url(target_tab=tab)
-                self.ajax_urls[tab] = url
-            except Exception:
-                print(f"Error finding ajax link for tab:  {tab}")
+                self.ajax_urls[tab] = self.get_ajax_url(target_tab=tab)
+            except Exception as e:
+                self.miss('ajax_url', e, tab=tab)
+                self.ajax_urls[tab] = None
+        if not self.ajax_urls[tab]:
+            return None
+        return self.ajax_request(url=self.ajax_urls[tab])
+
+    # soup of a tab payload
+    def parse_tab(self, tab, content):
+        with self.metrics.span('parse', self.game_url, tab=tab):
+            return self.parser.parse(content)
+
+    # class / data-* index of a soup, built on first use with one walk of the tree
+    def index(self, soup=None):
+        if soup is None:
+            soup = self.soup
+        key = id(soup)
+        if key not in self.indexes:
+            # keep the soup with its index so the id can't be reused
+            self.indexes[key] = (soup, self.parser.index(soup))
+        return self.indexes[key][1]
+
+    # an extractor could not find its field, counted per field and logged
+    def miss(self, field, error=None, **fields):
+        self.metrics.inc('extraction_misses_total', field=field)
+        log.warning("field not found", field=field, url=self.game_url,
+                    error=error, **fields)
+
+    # values of the GAME_FIELDS of a page ('game' or a tab) by (name, team),
+    # all read the first time one of them is asked for. Misses are counted,
+    # logged and kept in self.misses
+    def fields(self, page, soup=None):
+        if soup is None:
+            soup = self.soup if page == 'game' else self.tabs.soup(page)
+        key = ('fields', page, id(soup))
+        if key not in self.memo:
+            index = self.index(soup) if soup is not None else None
+            values, misses = GAME_FIELDS.evaluate(page, index)
+            for miss in misses:
+                self.miss(miss['field'], miss['error'], team=miss['team'])
+            self.misses.extend(misses)
+            # keep the soup so the id can't be reused
+            self.memo[key] = (soup, values)
+        return self.memo[key][1]
+
+    def field(self, name, page='game', team=None, soup=None):
+        if team is not None:
+            team = team.upper()
+        return self.fields(page, soup)[name, team]
 
     # get comparison stats like fast break points, bench points, points from turnovers etc
     def get_team_comparison_stats(self, soup, team):
@@ -186,7 +455,7 @@ class WebScrapper:
                  'points_from_the_bench': "Unknown"
                  }
         try:
-            divs = soup.find('li', {'class': 'comparison'}).find_all('div')
+            divs = self.index(soup).find('li', 'comparison').find_all('div')
             if divs:
                 for div in divs:
                     label = div.find(
@@ -197,8 +466,7 @@ class WebScrapper:
                     label = "_".join(label).lower()
                     stats[label] = val
         except Exception as e:
-            print("error finding comparison stats")
-            print(e)
+            self.miss('comparison_stats', e, team=team)
 
         return stats
 
@@ -217,8 +485,8 @@ class WebScrapper:
         }
 
         try:
-            lead_stats_list = soup.find(
-                'ul', {'class': 'lead-stats-list'}).find_all('li')
+            lead_stats_list = self.index(soup).find(
+                'ul', 'lead-stats-list').find_all('li')
             skip_labels = ['Lead changes', 'Times tied']
 
             if lead_stats_list:
@@ -235,21 +503,22 @@ class WebScrapper:
                         'span', {'class': 'team-' + team}).text.strip()
                     lead_stats[label] = val
         except Exception as e:
-            print("error finding lead stats")
-            print(e)
+            self.miss('lead_stats', e, team=team)
         return lead_stats
 
-    def get_game_in_brief(self, soup=None):
+    def get_game_in_brief(self, soup=None, preview_tab=None, compare_tab=None):
 
         # preview tab contains information about game date, time, arena etc
-        preview_tab_tab = self.ajax_request(url=self.ajax_urls['preview'])
+        if preview_tab is None:
+            preview_soup = self.tabs.soup('preview')
+        else:
+            preview_soup = self.parse_tab('preview', preview_tab)
 
-        sleep(1)
         # contains team comparison stats like like points in the paint, fast break points, lead stats etc
-        compare_tab = self.ajax_request(url=self.ajax_urls['team_comparison'])
-
-        preview_soup = BeautifulSoup(preview_tab_tab, 'html.parser')
-        compare_soup = BeautifulSoup(compare_tab, 'html.parser')
+        if compare_tab is None:
+            compare_soup = self.tabs.soup('team_comparison')
+        else:
+            compare_soup = self.parse_tab('team_comparison', compare_tab)
 
         self.comparison_data = compare_soup
 
@@ -273,8 +542,7 @@ class WebScrapper:
 
             result = 'W' if final_score > opp_score else 'L'
             # get images of top perfromers
-            img = self.soup.find(
-                'div', {'class': 'performer-content'}).find('div', {'class': 'team-' + team}).find('img')
+            img = self.field('top_performer_img', team=team)
 
             """
                     # save image as top performer name .png
@@ -308,11 +576,11 @@ class WebScrapper:
             game['final_score'] = final_score
             game['result'] = result
             game['top_performer'] = top_performer
-            game['top_performer_img'] = img['src']
+            game['top_performer_img'] = img
 
             quarterly_scores = self.get_quarterly_scores(team=team)
 
-            for quarter, score in quarterly_scores:
+            for quarter, score in quarterly_scores.items():
                 game[quarter] = score
 
             # add comparison and lead stats
@@ -326,38 +594,27 @@ class WebScrapper:
 
     def download_img(self, url, img_name):
         try:
-            print('\nfetching image......', end='')
-            res = requests.get(url, stream=True)
-            if res.status_code == 200:
-                print('done')
-                print(f'saving image {img_name}', end='')
-                with open(img_name, 'wb') as f:
-                    shutil.copyfileobj(res.raw, f)
-                print('......done')
-            else:
-                print(f'error downloading image {img_name}')
-                print("Error code: ", res.status_code)
+            # close the response so the connection goes back to the pool
+            with self.session.get(url, stream=True) as res:
+                if res.status_code == 200:
+                    with open(img_name, 'wb') as f:
+                        shutil.copyfileobj(res.raw, f)
+                    log.debug("image saved", url=url, filename=img_name)
+                else:
+                    log.error("image download failed", url=url,
+                              status=res.status_code)
 
         except Exception as e:
-            print('error downloading image')
-            print(e)
+            log.error("image download failed", url=url, error=e)
 
     def get_team_final_score(self, soup=None, team=None):
-
         if team is None:
             raise ValueError("Team must be specified")
-        if soup is None:
-            soup = self.soup
+        return self.field('final_score', team=team, soup=soup)
 
-        final_score = "Unknown"
-        team = team.upper()
-        try:
-            final_score = soup.find('div', {
-                                    'class': 'final-score'}).find('span', {'class': 'score-' + team}).text.strip()
-        except Exception as e:
-            print(f"error finding final score for team {team}")
-            print(e)
-        return final_score
+    # a game showing both final scores is over, its pages won't change again
+    def is_final(self):
+        return all(str(self.get_team_final_score(team=team)).isdigit() for team in 'AB')
 
     def get_quarterly_scores(self, soup=None, team=None):
         if team is None:
@@ -373,8 +630,8 @@ class WebScrapper:
             'Q4': None,
         }
         try:
-            scores_lis = soup.find(
-                'ul', {'class': 'period-list'}).find_all("li", {'class': 'period-item'})
+            scores_lis = self.index(soup).find(
+                'ul', 'period-list').find_all("li", {'class': 'period-item'})
             for li in scores_lis:
                 quarter = li.find(
                     'span', {'class': 'period-name'}).text.strip()
@@ -383,189 +640,115 @@ class WebScrapper:
                 scores[quarter] = score
 
         except Exception as e:
-            print("error finding quarterly scores")
-            print(e)
+            self.miss('quarterly_scores', e, team=team)
 
         return scores
 
     def get_top_performer(self, soup=None, team=None):
-        if soup is None:
-            soup = self.soup
         if team is None:
             raise ValueError("Expected a team name but got none")
-        top_performer = "Unknown"
-        team = team.upper()
+        return self.field('top_performer', team=team, soup=soup)
 
-        try:
-            top_performer = soup.find(
-                'div', {'class': 'athlete-' + team})\
-                .find('span', {'class': 'name'}).text.strip()
-        except:
-            print("Can't find top performer")
-        return top_performer
-
-    def get_game_date(self, soup):
-        date = "Unknown"
-        try:
-            date = soup.find('div', {'class': 'date_infos'}).find(
-                'div', {'class': 'date'}).text.strip()
-        except Exception as e:
-            print("Error, can't find game date")
-            print(e)
+    def get_game_date(self, soup=None):
+        return self.field('date', 'preview', soup=soup)
 
-        return date
+    def get_game_time(self, soup=None):
+        return self.field('time', 'preview', soup=soup)
 
-    def get_game_time(self, soup):
-        time = "Unknown"
-        try:
-            time = soup.find('div', {'class': 'date_infos'}).find(
-                'div', {'class': 'time'}).text.strip()
-            timezone = soup.find('span', {'class': 'timezone'}).text.strip()
-            time = time + ' ' + timezone
-        except Exception as e:
-            print("error finding game time")
-            print(e)
-
-        return time
+    def get_host_country(self, soup=None):
+        return self.field('city_or_country', 'preview', soup=soup)
 
-    def get_host_country(self, soup):
-        country = "Unknown"
-
-        try:
-            country = soup.find('div', {'class': 'date_infos'}).find(
-                'span', {'class': 'country_name'}).text.strip()
-        except Exception as e:
-            print("error can't find host country")
-            print(e)
-
-        return country
-
-    def get_game_arena(self, soup):
-        arena = "Unknown"
-        try:
-            arena = soup.find('div', {'class': 'location'}).text.strip()
-        except Exception as e:
-            print("error. can't find game arena")
-            print(e)
-
-        return arena
+    def get_game_arena(self, soup=None):
+        return self.field('arena', 'preview', soup=soup)
 
     def get_game_group(self, soup=None):
-        group = "Unknown"
-        if soup is None:
-            soup = self.soup
-        try:
-            group = soup.find('span', {'class': 'group'}).text.strip()
-        except Exception as e:
-            print("error, can't find game group")
-            print(e)
-
-        return group
+        return self.field('group', soup=soup)
 
     def get_tournament(self, url=None):
-        name = "FIBA-"
         if url is None:
             url = self.game_url
         try:
-            parts = url.split("/")[3:6]
-            name += "-".join(parts)
-        except:
-            print("unable to get tournament name")
-        return name.lower()
+            return tournament_from_url(url)
+        except Exception as e:
+            self.miss('tournament', e)
+        return "fiba-"
 
     def get_game_phase(self, soup=None):
-        phase = "Unknown"
-        if soup is None:
-            soup = self.soup
-        try:
-            phase = soup.find('span', {'class': 'phase'}).text.strip()
-        except:
-            print("error, can't find game phase")
-
-        return phase
+        return self.field('phase', soup=soup)
 
+    # where the name is comes from GAME_FIELDS, `tag` is only kept for
+    # older callers
     def get_team_name(self, soup=None, tag='div', team=None):
-        name = "Unknown"
         if team is None:
             raise ValueError("Please specify team (A or B)")
+        return self.field('team_name', team=team, soup=soup)
+
+    # PlayEvents of both teams in game order, in one pass over the actions.
+    # The site lists the newest action first, the list is walked backwards
+    def iter_play_by_play(self, soup=None):
+        if soup is None:
+            soup = self.soup
 
-        team = team.upper()
         try:
-            if soup is None:
-                soup = self.soup
-            name = soup.find(tag, {'class': 'team-' + team}).find(
-                'span', {'class': 'team-name'}).text.strip()
+            actions = self.index(soup).find_all_any('li', TEAM_CLASSES)
         except Exception as e:
-            print("error, can't find team name")
-            print(e)
+            self.miss('play_by_play', e)
+            return
 
-        return name
+        event = 0
+        for action in reversed(actions):
+            try:
+                play = parse_action(action, event + 1)
+            except Exception as e:
+                self.miss('play_by_play', e)
+                continue
+            event += 1
+            yield play
 
     def get_game_play_by_play(self, soup=None, team=None):
         if team is None:
             raise ValueError("team must be specified")
 
+        team_names = (self.get_team_name(team='A'), self.get_team_name(team='B'))
+        plays = []
+        # the plays of the team as listed on the site, newest first
+        for play in self.iter_play_by_play(soup):
+            if play.team == team:
+                row = play.to_dict(team_names)
+                del row['team']
+                plays.append(row)
+        plays.reverse()
+        return plays
+
+    # BoxscoreLines of both teams, team A first, players then totals. Both
+    # sections come out of one parse of the tab
+    def iter_boxscore(self, soup=None):
         if soup is None:
             soup = self.soup
 
-        opponent = ""
-        if team == 'A':
-            opponent = self.get_team_name(team="B")
-        else:
-            opponent = self.get_team_name(team="A")
-        plays = []
-
         try:
-            # find all plays belong to team
-            all_actions = soup.find_all('li', {'class': 'x--team-'+team})
-            for action in all_actions:
-
-                # technical fouls are counted as rebs for coaches,
-                athlete_image = "unknown"
-                if action.find('span', {'class': 'athlete-name'}) == None:
-                    athlete_name = 'Coach'
-                    athlete_image = action.find(
-                        'div', {'class': 'action-scores'}).find('img', {'class': 'nat-flag'})['src']
-                else:
-                    athlete_name = action.find(
-                        'span', {'class': 'athlete-name'}).text.strip()
-                    athlete_image = action.find(
-                        'div', {'class': 'athlete-info'}).find('img')['src']
-
-                quarter = action.find('span', {'class': 'period'}).text.strip()
-                time = action.find('span', {'class': 'time'}).text.strip()
-
-                description = action.find(
-                    'span', {'class': 'action-description'}).text.strip()
-
-                scores = action.find(
-                    'div', {'class': 'score-info'}).find_all('span')
-                team_score = scores[0].text.strip()
-                opp_score = scores[1].text.strip()
-
-                plays.append({'quarter': quarter,
-                              'time': time,
-                              'athlete_name': athlete_name,
-                              'description': description,
-                              'opponent': opponent,
-                              'team_score': team_score,  # home team
-                              'opp_score': opp_score,
-                              'athlete_image': athlete_image})
+            sections = self.index(soup).find_all_any('section', TEAM_SECTIONS)
         except Exception as e:
-            print("Error finding play by play data")
-            print(e)
-        return plays
+            self.miss('boxscore', e)
+            return
+
+        for section in sections:
+            team = section_team(section)
+            try:
+                lines = parse_section(section, team)
+            except Exception as e:
+                self.miss('boxscore', e, team=team)
+                continue
+            yield from lines
 
+    # the raw section element of a team, see iter_boxscore for the stats
     def get_boxscore(self, soup=None, team=None):
         boxscore = None
         try:
-            print('getting boxscore for team ' + team.upper(), end="")
-            team = 'box-score_team-' + team.upper()
-            boxscore = soup.find('section', {'class': team})
-            print('...done')
+            boxscore = self.index(soup).find(
+                'section', 'box-score_team-' + team.upper())
         except Exception as e:
-            print("...error")
-            print(e)
+            self.miss('boxscore', e, team=team)
         return boxscore
 
     def get_ajax_url(self, target_tab=None):
@@ -578,12 +761,12 @@ class WebScrapper:
             raise ValueError(f"Target tab must be one of {self.allowed_tabs}")
 
         try:
-            target_element = self.soup.find(
-                'li', {'data-tab-content': target_tab})
+            target_element = self.index().find_data(
+                'li', 'data-tab-content', target_tab)
             if target_element:
                 data_ajax_url = target_element.get('data-ajax-url')
         except Exception as e:
-            print(f"Error finding data ajax url for {target_tab}")
+            self.miss('ajax_url', e, tab=target_tab)
         return data_ajax_url
 
     def ajax_request(self, url=None, headers=None, cookies=None):
@@ -592,53 +775,74 @@ class WebScrapper:
 
         response = None
         try:
-            print('Fetching data...', end='')
-            BASE_URL = 'https://www.fiba.basketball'
             if headers is None:
                 headers = self.headers
             if cookies is None:
                 cookies = self.cookies
 
-            if BASE_URL not in url:
-                url = BASE_URL + url
-            response = requests.get(
-                url, headers=headers, cookies=cookies)
-            print('done')
+            url = absolute_url(url, self.base_url)
+            with self.metrics.span('fetch', url, tab='ajax'):
+                response = self.session.get(
+                    url, headers=headers, cookies=cookies)
 
         except Exception as e:
-            print("error")
-            print(e)
+            log.error("request failed", url=url, error=e)
 
         return response.content if response else None
 
-    # recieves a dict or list of dicts
+    # run the extraction methods building `outputs` (all by default) of
+    # the loaded game, only the tabs they need are fetched and parsed
+    def extract_game(self, outputs=None):
+        outputs = OUTPUTS if outputs is None else outputs
+        game = {}
+        game['url'] = self.game_url
+        game['team_names'] = (self.get_team_name(team='A'),
+                              self.get_team_name(team='B'))
+
+        game['game_in_brief'] = []
+        if 'game_in_brief' in outputs and all(
+                self.tabs.has(tab) for tab in OUTPUT_TABS['game_in_brief']):
+            with self.metrics.span('extract', self.game_url, tab='game_in_brief'):
+                game['game_in_brief'] = [{key: detach(value) for key, value in row.items()}
+                                         for row in self.get_game_in_brief()]
+
+        # PlayEvents of both teams in game order
+        game['play_by_play'] = []
+        if 'play_by_play' in outputs and self.tabs.has('play_by_play'):
+            play_by_play_soup = self.tabs.soup('play_by_play')
+            with self.metrics.span('extract', self.game_url, tab='play_by_play'):
+                game['play_by_play'] = list(
+                    self.iter_play_by_play(play_by_play_soup))
+
+        # BoxscoreLines of both teams
+        game['boxscore'] = []
+        if 'boxscore' in outputs and self.tabs.has('boxscore'):
+            boxscore_soup = self.tabs.soup('boxscore')
+            with self.metrics.span('extract', self.game_url, tab='boxscore'):
+                game['boxscore'] = list(self.iter_boxscore(boxscore_soup))
+        return game
+
+    # recieves a dict or list of dicts, see write_csv. The header is written
+    # when the file is new (`header` is only kept for older callers)
     def to_csv(self, data=None, filename=None, header=True):
         if filename is None:
             raise ValueError("Filename must be provided.")
         if data is None:
             raise ValueError("Data to be saved must be provided.")
+        if not isinstance(data, (list, dict)):
+            raise TypeError('data must be a dict or list of dicts')
 
-        headers = []
-        if header:
-            if isinstance(data, list):
-                headers = data[0].keys()
-            elif isinstance(data, dict):
-                headers = data.keys()
-            else:
-                raise TypeError('data must be a dict or list of dicts')
+        write_csv(self.writers, filename, data)
 
-        print(f'saving data to {filename}.......', end='')
-        with open(filename, 'a') as fh:
-            writer = csv.DictWriter(fh, fieldnames=headers)
-            if header:
-                writer.writeheader()
+    def close(self):
+        close_writers(self.writers)
+        self.writers = {}
 
-            if isinstance(data, list):
-                writer.writerows(data)
-            else:
-                writer.writerow(data)
-        fh.close()
-        print('done')
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def to_html(self, data=None, filename=None):
         if filename is None:
@@ -647,119 +851,319 @@ class WebScrapper:
             raise ValueError("Data to save must be specified")
 
         filename = filename.lower()
-        print(f"saving data to {filename}...", end="")
+        log.debug("saving data", filename=filename)
         with open(filename, 'w') as fh:
             fh.write(str(data))
-        print("done")
 
 
-if __name__ == '__main__':
-
-    with open('games-links.csv', 'r') as f:
-        csv_data = csv.DictReader(f)
-        BASE_URL = "https://www.fiba.basketball"
-
-        first = True
-        i = 0
-        raw_data_path = "final/data/raw/"
+# plain str of a value out of a tree. A NavigableString (a str subclass)
+# keeps its whole tree alive for as long as the record lives
+def detach(value):
+    if isinstance(value, str) and type(value) is not str:
+        return str(value)
+    return value
+
+
+# <li ...> tags and their attributes, see find_ajax_urls
+LI_TAG = re.compile(r'<li\b[^>]*>', re.IGNORECASE)
+TAG_ATTRIBUTE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+
+# data-ajax-url of the game tabs read straight from the page bytes, lets the
+# fetching side find the tabs without building a tree
+def find_ajax_urls(content, tabs=None):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    ajax_urls = {}
+    for tag in LI_TAG.findall(content):
+        attrs = {name.lower(): html.unescape(double if double else single)
+                 for name, double, single in TAG_ATTRIBUTE.findall(tag)}
+        tab = attrs.get('data-tab-content')
+        if tab and 'data-ajax-url' in attrs and tab not in ajax_urls:
+            if tabs is None or tab in tabs:
+                ajax_urls[tab] = attrs['data-ajax-url']
+    return ajax_urls
+
+
+# parse and extract one fetched game into plain records, this is what the
+# parsing worker processes run. The game's timings and misses come back in
+# game['metrics'], to be merged into the parent's (see Metrics.merge)
+def extract_game(url, page, tabs, parser=None, outputs=None):
+    recorder = Metrics()
+    scrapper = WebScrapper(parser=parser, metrics=recorder)
+    scrapper.load(page, url, tabs=tabs)
+    game = scrapper.extract_game(outputs)
+    game['final'] = scrapper.is_final()
+    # the trees are freed here, not whenever the garbage collector runs
+    scrapper.release()
+    # which tabs came back, a game missing any is retried on the next run
+    game['tabs'] = {tab: bool(tabs.get(tab)) for tab in tabs_for(outputs)}
+    game['metrics'] = recorder.snapshot()
+    return game
+
+
+# csv files the crawl appends to
+def csv_outputs(data_path):
+    return {
+        'games_in_brief': os.path.join(data_path, 'all_games_in_brief.csv'),
+        'play_by_play': os.path.join(data_path, 'all_play_by_play.csv'),
+        'boxscore': os.path.join(data_path, 'all_boxscores.csv'),
+    }
+
+
+# folder of the typed datasets of the outputs in data_path
+def columnar_path(data_path):
+    return os.path.join(data_path, 'columnar')
+
+
+# schemas of the outputs, rows written by to_csv take the one they share
+# the most fields with
+CSV_SCHEMAS = [GAME_IN_BRIEF_FIELDS, PLAY_BY_PLAY_FIELDS, BOXSCORE_FIELDS, ROSTER_FIELDS]
+
+
+# long lived writer of the rows of a to_csv file. Its columns are the
+# header of the file when it has one, else the schema of the output `row`
+# belongs to, else the keys of `row`
+def csv_writer(filename, row):
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        with open(filename, 'r', newline='') as fh:
+            header = next(csv.reader(fh), [])
+        # files written before the extra column existed drop unknown fields
+        extras = 'collect' if EXTRA_FIELD in header else 'ignore'
+        return CsvWriter(filename, header, extras=extras)
+    fields = max(CSV_SCHEMAS, key=lambda schema: len(set(schema) & set(row)))
+    if not set(fields) & set(row):
+        fields = list(row)
+    return CsvWriter(filename, fields, extras='collect')
+
+
+# write the rows of `data` (a dict or a list of them) to filename through
+# the long lived writer of the file in `writers`. The rows are on disk when
+# this returns, callers that never close the scrapper lose nothing
+def write_csv(writers, filename, data):
+    rows = data if isinstance(data, list) else [data]
+    if filename not in writers:
+        log.debug("saving data", filename=filename)
+        writers[filename] = csv_writer(filename, rows[0] if rows else {})
+    writers[filename].write_rows(rows)
+    writers[filename].flush()
+
+
+# long lived writers of the outputs, close them at the end of the run.
+# columnar_format ('parquet' or 'arrow') adds typed datasets next to the csvs
+def open_writers(data_path, batch_size=500, columnar_format=None, database=None):
+    files = csv_outputs(data_path)
+    writers = {
+        # overtime periods past OT3 and new fields land in the extra column
+        'games_in_brief': CsvWriter(files['games_in_brief'], GAME_IN_BRIEF_FIELDS,
+                                    extras='collect', batch_size=batch_size),
+        'play_by_play': CsvWriter(files['play_by_play'], PLAY_BY_PLAY_FIELDS,
+                                  batch_size=batch_size),
+        'boxscore': CsvWriter(files['boxscore'], BOXSCORE_FIELDS, batch_size=batch_size),
+    }
+    if columnar_format:
+        from columnar import ColumnarWriter
+        writers['columnar'] = ColumnarWriter(columnar_path(data_path),
+                                             format=columnar_format)
+    if database:
+        from storage import SqliteStore
+        writers['database'] = SqliteStore(database)
+    return writers
+
+
+def close_writers(writers):
+    for writer in writers.values():
+        writer.close()
+
+
+# append-only csv outputs of the writers, with their size once flushed.
+# Called after every game, before it is marked done in the manifest, so
+# the database (see SqliteStore) commits the game's rows too
+def flush_writers(writers):
+    sizes = {}
+    for writer in writers.values():
+        if isinstance(writer, CsvWriter):
+            writer.flush()
+            sizes[writer.filename] = os.path.getsize(writer.filename)
+        elif hasattr(writer, 'flush'):
+            writer.flush()
+    return sizes
+
+
+# save the outputs of one extracted game (see WebScrapper.extract_game).
+# The raw tabs are not saved here, the crawler archives the responses as
+# they come in (see archive.RawArchive)
+def save_game(game, writers, metrics=None):
+    game_in_brief = game['game_in_brief']
+    play_by_play = game['play_by_play']
+    span = (metrics if metrics is not None else get_metrics()).span
+
+    # game in brief
+    with span('write', game['url'], tab='game_in_brief'):
+        writers['games_in_brief'].write_rows(game_in_brief)
+
+    # play by play of both teams, in game order
+    with span('write', game['url'], tab='play_by_play'):
+        for play in play_by_play:
+            writers['play_by_play'].write(
+                dict(play.to_dict(game['team_names']), game_url=game['url']))
+
+    # player and team totals lines of both teams
+    with span('write', game['url'], tab='boxscore'):
+        for line in game['boxscore']:
+            writers['boxscore'].write(
+                dict(line.to_dict(game['team_names']), game_url=game['url']))
+
+    # typed columnar copy, one file per dataset as the game finishes
+    if 'columnar' in writers:
+        with span('write', game['url'], tab='columnar'):
+            writers['columnar'].write_game(game)
+
+    # normalized database, the game's rows replace any earlier ones
+    if 'database' in writers:
+        with span('write', game['url'], tab='database'):
+            writers['database'].write_game(game)
 
-        if not os.path.exists(raw_data_path):
-            os.makedirs(raw_data_path)
 
-        for d in csv_data:
+if __name__ == '__main__':
+    import columnar
+    from archive import RawArchive
+    from crawler import AsyncCrawler
+    from discovery import ScheduleDiscovery, not_done
+    from images import ImageStore
+    from manifest import FAILED, CrawlManifest, fingerprint
+    from pipeline import Pipeline
+
+    # SCRAPPER_LOG_LEVEL=DEBUG logs the timing of every phase of every game,
+    # SCRAPPER_LOG_JSON=1 writes one JSON object per line
+    setup_logging(os.environ.get('SCRAPPER_LOG_LEVEL', 'INFO'),
+                  json_lines=os.environ.get('SCRAPPER_LOG_JSON') == '1')
+    metrics = get_metrics()
+
+    # number of requests in flight at any time
+    CONCURRENCY = 4
+
+    # outputs built by this run, only their tabs are fetched, e.g
+    # SCRAPPER_OUTPUTS=game_in_brief makes 3 requests per game
+    outputs = os.environ.get('SCRAPPER_OUTPUTS', ','.join(OUTPUTS)).split(',')
+
+    data_path = "final/data/"
+    archive_path = "final/raw/responses.warc"
+    cache_path = "final/cache/responses.sqlite"
+    manifest_path = "final/manifest.sqlite"
+    metrics_path = "final/metrics"
+    database_path = "final/scrapper.sqlite"
+    images_path = "final/images/"
+
+    # SCRAPPER_SCHEDULE=<schedule page urls, comma separated> crawls the
+    # games linked from the schedules as they are found, instead of the
+    # games of games-links.csv
+    schedule = os.environ.get('SCRAPPER_SCHEDULE')
+
+    # games finished by an earlier run are skipped
+    manifest = CrawlManifest(manifest_path)
+    if schedule:
+        log.info("starting crawl", schedule=schedule, **manifest.summary())
+    else:
+        with open('games-links.csv', 'r') as f:
+            urls = [d['url'] for d in csv.DictReader(f)]
+        urls = [absolute_url(url) for url in urls]
+        urls = list(manifest.pending(urls, tabs_for(outputs)))
+        # games that failed on an earlier run
+        for url in urls:
+            if manifest.status(url) == FAILED:
+                metrics.inc('retries_total')
+                log.debug("retrying game", url=url, tabs=manifest.failed_tabs(url))
+        log.info("starting crawl", games=len(urls), **manifest.summary())
+
+    # one session for the whole run so connections are kept alive
+    # between games instead of reconnecting for every request, paced per
+    # host by the rate limiter. Re-runs are served from the response cache
+    cache = ResponseCache(cache_path, ttl_rules=CACHE_TTL_RULES,
+                          default_ttl=CACHE_DEFAULT_TTL)
+    session = create_session(pool_maxsize=CONCURRENCY,
+                             rate_limiter=RateLimiter(rate=2.0, burst=4),
+                             cache=cache)
+    # original bytes of every page and tab, for reprocessing without the network
+    archive = RawArchive(archive_path)
+    crawler = AsyncCrawler(session=session, concurrency=CONCURRENCY,
+                           tabs=tabs_for(outputs), archive=archive)
+
+    if schedule:
+        discovery = ScheduleDiscovery(session=session, concurrency=CONCURRENCY)
+        urls = not_done(discovery.discover(schedule.split(',')),
+                        lambda url: manifest.is_done(url, tabs_for(outputs)))
+
+    # fetched games are parsed on every core while the next ones download.
+    # SCRAPPER_RSS_BUDGET_MB stops taking in games while the crawl
+    # process is over that much resident memory
+    rss_budget = os.environ.get('SCRAPPER_RSS_BUDGET_MB')
+    pipeline = Pipeline(crawler, parser=fastest_parser(), outputs=outputs,
+                        rss_budget=int(rss_budget) * 1024 * 1024 if rss_budget else None)
+
+    # drop rows of a game that was being written when the last run died
+    manifest.restore_outputs(csv_outputs(data_path).values())
+
+    # images repeat in every play of a player, each is fetched once at the end
+    images = ImageStore(images_path, session=session, concurrency=CONCURRENCY,
+                        base_url=BASE_URL)
+
+    # typed parquet datasets as well when pyarrow is installed, and the
+    # normalized database for queries across games
+    writers = open_writers(data_path,
+                           columnar_format='parquet' if columnar.available() else None,
+                           database=database_path)
+
+    i = 0
+    try:
+        for game in pipeline.run(urls):
             i += 1
-
-            url = ""
-            if BASE_URL not in d['url']:
-                url = BASE_URL + d['url']
-            else:
-                url = d['url']
-
-            print(f"Iteration ===========: {i}")
-            print(f"scrapping ===========: {url}")
-
-            scrapper = WebScrapper()
-
-            scrapper.init(url)
-
-            tabs = ['preview', 'play_by_play', 'boxscore',
-                    'videos', 'shot_chart', 'team_comparison']
-
-            # extra data urls
-            ajax_urls = {}
-            for tab in tabs:
-                url = scrapper.get_ajax_url(target_tab=tab)
-                ajax_urls[tab] = url
-
-            game_in_brief = scrapper.get_game_in_brief()
-
-            # make request to get boxscore data for both teams
-            data = scrapper.ajax_request(url=ajax_urls['boxscore'])
-
-            team_A_name = "team_A"
-            team_B_name = "team_B"
-
-            try:
-                team_A_name = scrapper.get_team_name('A')
-                team_B_name = scrapper.get_team_name('B')
-            except:
-                pass
-
-            # get each boxscore
-            try:
-                boxscore_team_A = scrapper.get_boxscore(
-                    team='A', soup=BeautifulSoup(data))
-                boxscore_team_B = scrapper.get_boxscore(
-                    team='B', soup=BeautifulSoup(data))
-            except:
-                print("Unable to get boxscore data")
-
-            # ------------------- save data -----------------
-            # date is prefixed to file name
-            date_prefix = game_in_brief[0]['date'].split(" ")[1:]
-            date_prefix = "_".join(date_prefix)
-
-            # game in brief
-            scrapper.to_csv(data=game_in_brief,
-                            filename="all_games_in_brief.csv", header=first)
-            first = False
-            # save boxscores
-            if boxscore_team_A:
-                scrapper.to_html(data=boxscore_team_A,
-                                 filename=os.path.join(raw_data_path, date_prefix + team_A_name + '_boxscore.html'))
-                scrapper.to_html(data=boxscore_team_B,
-                                 filename=os.path.join(raw_data_path, date_prefix + team_B_name + '_boxscore.html'))
-            # team comparision
-            if scrapper.comparison_data:
-
-                scrapper.to_html(data=scrapper.comparison_data, filename=os.path.join(
-                    raw_data_path, date_prefix + team_A_name + "_" + team_B_name + '_team_comparison.html'))
-
-            # get play by play data
-            sleep(1)
-            print("Getting play by play data...", end="")
-            try:
-                play_by_play_raw_data = scrapper.ajax_request(
-                    url=ajax_urls['play_by_play'])
-                play_by_play_soup = BeautifulSoup(
-                    play_by_play_raw_data, 'html.parser')
-
-                play_by_play_team_A = scrapper.get_game_play_by_play(
-                    soup=play_by_play_soup, team="A")
-
-                play_by_play_team_B = scrapper.get_game_play_by_play(
-                    soup=play_by_play_soup, team="B")
-                print("done")
-            except:
-                print("Print unable to get play by play data")
-
-            if len(play_by_play_team_A) > 0:
-
-                scrapper.to_csv(data=play_by_play_team_A,
-                                filename=os.path.join(raw_data_path, date_prefix + team_A_name + "_pbp.csv"))
-                scrapper.to_csv(data=play_by_play_team_B,
-                                filename=os.path.join(raw_data_path, date_prefix + team_B_name + "_pbp.csv"))
-
-            print("Sleeping for one second....", end='')
-            sleep(1)
-            print('done')
+            log.info("game scrapped", n=i, url=game['url'])
+            metrics.inc('games_total')
+
+            # tabs that failed are fetched again next run, the rest comes
+            # from the response cache
+            if not all(game['tabs'].values()):
+                log.warning("missing tabs", url=game['url'],
+                            tabs=[tab for tab, ok in game['tabs'].items() if not ok])
+                metrics.inc('games_failed_total')
+                manifest.fail(game['url'], error='missing tabs',
+                              tabs=game['tabs'])
+                continue
+
+            # a game not played yet or still going (schedule pages list
+            # them too) is crawled again next run instead of being done
+            # with its partial rows for good
+            if not game['final']:
+                log.info("game not final", url=game['url'])
+                metrics.inc('games_not_final_total')
+                manifest.fail(game['url'], error='not final')
+                continue
+
+            # a game crawled again for a tab it missed, its other outputs
+            # are saved already
+            for output in saved_outputs(manifest.done_tabs(game['url']), outputs):
+                game[output] = []
+            save_game(game, writers)
+            # image urls are in the image index before the game is done, a
+            # crash before download() doesn't lose them
+            images.add_game(game)
+            manifest.complete(game['url'], fingerprint(game), tabs=game['tabs'],
+                              outputs=flush_writers(writers))
+            # a finished game's page and tabs are served from the cache for good
+            cache.pin(game['url'])
+    finally:
+        close_writers(writers)
+        manifest.close()
+        archive.close()
+
+    images.download()
+    images.close()
+
+    log.info("crawl finished", games=i, cache_hits=cache.hits,
+             revalidated=cache.revalidated, cache_misses=cache.misses)
+    cache.close()
+
+    # per phase timings and counters, for node exporter and for people
+    metrics.write(metrics_path + '.prom')
+    metrics.write(metrics_path + '.json')
@@ -0,0 +1,142 @@
+"""
+    Name        : Scrapper Session
+    Date        : 18-10-2026
+    Description : Shared, pooled HTTP session used by all the scrappers.
+"""
+
+
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import get_metrics
+from ratelimit import RateLimiter, parse_retry_after
+
+
+# default pool settings, one pool per host and up to 10 kept-alive
+# connections per pool
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+
+class ScrapperSession(requests.Session):
+    """requests.Session with a bounded per-host connection pool.
+
+    Connections are kept alive and reused between requests to the same
+    host, so a crawl pays for the TCP+TLS handshake once per connection
+    instead of once per request. When a rate limiter is given every request
+    waits for a token of its host and reports back how the server answered.
+    When a cache is given GET requests are answered from it while fresh and
+    revalidated with the server once stale. Requests by status code,
+    bytes downloaded and cache results are counted in `metrics`.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 pool_block=False, max_retries=0, headers=None, rate_limiter=None,
+                 cache=None, metrics=None):
+        super().__init__()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.metrics = metrics if metrics is not None else get_metrics()
+
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block,
+                              max_retries=max_retries)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        if headers:
+            self.headers.update(headers)
+
+    def request(self, method, url, *args, **kwargs):
+        # streamed bodies (images) are written straight to disk, never cached
+        if self.cache is None or method.upper() != 'GET' or kwargs.get('stream'):
+            return self._send(method, url, *args, **kwargs)
+
+        if kwargs.get('params'):
+            url = requests.Request('GET', url, params=kwargs.pop('params')).prepare().url
+        headers = dict(self.headers)
+        headers.update(kwargs.get('headers') or {})
+
+        entry = self.cache.get(url, headers)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                self.cache.hits += 1
+                self.metrics.inc('cache_requests_total', result='hit')
+                return entry.to_response()
+
+            conditional = dict(kwargs.get('headers') or {})
+            if entry.etag:
+                conditional['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                conditional['If-Modified-Since'] = entry.last_modified
+            kwargs['headers'] = conditional
+
+        response = self._send(method, url, *args, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.revalidated += 1
+            self.metrics.inc('cache_requests_total', result='revalidated')
+            self.cache.refresh(entry)
+            return entry.to_response()
+
+        self.cache.misses += 1
+        self.metrics.inc('cache_requests_total', result='miss')
+        if response.status_code == 200:
+            self.cache.store(url, headers, response)
+        return response
+
+    def _send(self, method, url, *args, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        start = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            self.metrics.inc('http_errors_total')
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(url, elapsed=time.monotonic() - start)
+            raise
+        self._count(response, kwargs.get('stream'))
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(url, response.status_code,
+                                     elapsed=time.monotonic() - start,
+                                     retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        return response
+
+    def _count(self, response, stream=False):
+        self.metrics.inc('http_requests_total', status=response.status_code)
+        # streamed bodies are not read yet, their size is announced
+        if stream:
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        self.metrics.inc('downloaded_bytes_total', size)
+
+
+_shared_session = None
+
+
+def create_session(**kwargs):
+    """Create a new pooled session, see ScrapperSession for options."""
+    return ScrapperSession(**kwargs)
+
+
+def get_session():
+    """Return the process wide shared session, creating it on first use."""
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = create_session(rate_limiter=RateLimiter())
+    return _shared_session
+
+
+def set_session(session):
+    """Replace the process wide shared session (e.g with a configured one)."""
+    global _shared_session
+    _shared_session = session
+    return session
@@ -0,0 +1,299 @@
+"""
+    Name        : SQLite Storage
+    Date        : 18-10-2026
+    Description : Normalized SQLite database of games, teams, players, plays and boxscores.
+"""
+
+
+import sqlite3
+import time
+
+from boxscore import STAT_FIELDS
+from converters import to_date, to_int, to_seconds
+from paths import make_parent
+from plays import COACH
+
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS teams (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS players (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        team_id INTEGER NOT NULL REFERENCES teams (id),
+        first_name TEXT,
+        last_name TEXT,
+        dob TEXT,
+        jersey_number TEXT,
+        position TEXT,
+        height TEXT,
+        image TEXT,
+        UNIQUE (name, team_id)
+    );
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL UNIQUE,
+        tournament TEXT,
+        phase TEXT,
+        "group" TEXT,
+        date TEXT,
+        time TEXT,
+        arena TEXT,
+        city_or_country TEXT,
+        team_a_id INTEGER REFERENCES teams (id),
+        team_b_id INTEGER REFERENCES teams (id),
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS game_teams (
+        game_id INTEGER NOT NULL REFERENCES games (id),
+        team_id INTEGER NOT NULL REFERENCES teams (id),
+        opponent_id INTEGER REFERENCES teams (id),
+        final_score INTEGER,
+        result TEXT,
+        q1 INTEGER, q2 INTEGER, q3 INTEGER, q4 INTEGER,
+        ot1 INTEGER, ot2 INTEGER, ot3 INTEGER,
+        top_performer_id INTEGER REFERENCES players (id),
+        points_from_turnover INTEGER,
+        second_chance_points INTEGER,
+        fast_break_points INTEGER,
+        points_in_the_paint INTEGER,
+        points_from_the_bench INTEGER,
+        biggest_lead INTEGER,
+        biggest_scoring_run TEXT,
+        times_leading_seconds INTEGER,
+        PRIMARY KEY (game_id, team_id)
+    );
+    CREATE TABLE IF NOT EXISTS plays (
+        game_id INTEGER NOT NULL REFERENCES games (id),
+        event INTEGER NOT NULL,
+        team_id INTEGER NOT NULL REFERENCES teams (id),
+        player_id INTEGER REFERENCES players (id),
+        period INTEGER,
+        clock_seconds INTEGER,
+        description TEXT,
+        team_score INTEGER,
+        opp_score INTEGER,
+        PRIMARY KEY (game_id, event)
+    );
+    CREATE TABLE IF NOT EXISTS boxscore_lines (
+        game_id INTEGER NOT NULL REFERENCES games (id),
+        line INTEGER NOT NULL,
+        team_id INTEGER NOT NULL REFERENCES teams (id),
+        player_id INTEGER REFERENCES players (id),
+        totals INTEGER NOT NULL,
+        played INTEGER NOT NULL,
+        jersey_number TEXT,
+        {stats},
+        PRIMARY KEY (game_id, line)
+    );
+    CREATE INDEX IF NOT EXISTS games_date ON games (date);
+    CREATE INDEX IF NOT EXISTS game_teams_team ON game_teams (team_id);
+    CREATE INDEX IF NOT EXISTS plays_player ON plays (player_id);
+    CREATE INDEX IF NOT EXISTS plays_team ON plays (team_id);
+    CREATE INDEX IF NOT EXISTS boxscore_lines_player ON boxscore_lines (player_id);
+    CREATE INDEX IF NOT EXISTS boxscore_lines_team ON boxscore_lines (team_id);
+""".replace('{stats}', ',\n        '.join(f"{name} INTEGER" for name in STAT_FIELDS))
+
+# game in brief fields of the game_teams table, by column
+GAME_TEAM_INTS = {
+    'final_score': 'final_score', 'q1': 'Q1', 'q2': 'Q2', 'q3': 'Q3', 'q4': 'Q4',
+    'ot1': 'OT1', 'ot2': 'OT2', 'ot3': 'OT3',
+    'points_from_turnover': 'points_from_turnover',
+    'second_chance_points': 'second_chance_points',
+    'fast_break_points': 'fast_break_points',
+    'points_in_the_paint': 'points_in_the_paint',
+    'points_from_the_bench': 'points_from_the_bench',
+    'biggest_lead': 'biggest_lead',
+}
+
+
+class SqliteStore:
+    """Extracted games in a normalized SQLite database.
+
+    Teams and players are stored once and referenced by id from the games,
+    per team game stats (scores, comparison and lead stats), plays and
+    boxscore lines, with indexes on the game date, the team and the player
+    for queries like every play of a player in a season. Writing a game is
+    an upsert keyed on its url, the rows of a game scraped again replace
+    the old ones output by output. Games are committed `batch_size` at a
+    time (and on flush and close), in WAL mode so the database can be read
+    during a crawl. A crawl flushes the writers before a game is marked
+    done in its manifest (see scrapper.flush_writers), so a game marked
+    done always has its rows committed. Used as one of the writers of
+    scrapper.open_writers.
+    """
+
+    def __init__(self, path, batch_size=50):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = 0
+        self.games_written = 0
+        make_parent(path)
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+        # ids of the teams and players seen by this writer
+        self.team_ids = {}
+        self.player_ids = {}
+
+    def team_id(self, name):
+        if not name:
+            return None
+        if name not in self.team_ids:
+            self.db.execute("INSERT OR IGNORE INTO teams (name) VALUES (?)", (name,))
+            self.team_ids[name] = self.db.execute(
+                "SELECT id FROM teams WHERE name = ?", (name,)).fetchone()[0]
+        return self.team_ids[name]
+
+    def player_id(self, name, team_id, **fields):
+        """Id of a player of a team, the fields given update the player."""
+        if not name or name == COACH or team_id is None:
+            return None
+        key = (name, team_id)
+        if key not in self.player_ids:
+            self.db.execute(
+                "INSERT OR IGNORE INTO players (name, team_id) VALUES (?, ?)", key)
+            self.player_ids[key] = self.db.execute(
+                "SELECT id FROM players WHERE name = ? AND team_id = ?", key).fetchone()[0]
+        fields = {field: value for field, value in fields.items() if value}
+        if fields:
+            assignments = ', '.join(f"{field} = ?" for field in fields)
+            self.db.execute(f"UPDATE players SET {assignments} WHERE id = ?",
+                            (*fields.values(), self.player_ids[key]))
+        return self.player_ids[key]
+
+    def _upsert_game(self, game, teams):
+        first = game['game_in_brief'][0] if game['game_in_brief'] else {}
+        date = to_date(first.get('date'))
+        self.db.execute("""
+            INSERT INTO games (url, tournament, phase, "group", date, time, arena,
+                               city_or_country, team_a_id, team_b_id, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                tournament = COALESCE(excluded.tournament, tournament),
+                phase = COALESCE(excluded.phase, phase),
+                "group" = COALESCE(excluded."group", "group"),
+                date = COALESCE(excluded.date, date),
+                time = COALESCE(excluded.time, time),
+                arena = COALESCE(excluded.arena, arena),
+                city_or_country = COALESCE(excluded.city_or_country, city_or_country),
+                team_a_id = excluded.team_a_id, team_b_id = excluded.team_b_id,
+                updated_at = excluded.updated_at
+            """, (game['url'], first.get('tournament'), first.get('phase'), first.get('group'),
+                  date.isoformat() if date else None, first.get('time'), first.get('arena'),
+                  first.get('city_or_country'), teams['A'], teams['B'], time.time()))
+        return self.db.execute(
+            "SELECT id FROM games WHERE url = ?", (game['url'],)).fetchone()[0]
+
+    # rows of a table for a game scraped again are replaced, a run that
+    # didn't build an output leaves its earlier rows alone
+    def _replace(self, table, game_id, columns, rows):
+        if not rows:
+            return
+        self.db.execute(f"DELETE FROM {table} WHERE game_id = ?", (game_id,))
+        self.db.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows)
+
+    def _game_teams(self, game_id, game):
+        rows = []
+        for row in game['game_in_brief']:
+            team_id = self.team_id(row.get('team'))
+            rows.append((
+                game_id, team_id, self.team_id(row.get('opponent')),
+                *[to_int(row.get(field)) for field in GAME_TEAM_INTS.values()],
+                self.player_id(row.get('top_performer'), team_id,
+                               image=row.get('top_performer_img')),
+                row.get('result'), row.get('biggest_scoring_run'),
+                to_seconds(row.get('times_leading')),
+            ))
+        self._replace('game_teams', game_id, [
+            'game_id', 'team_id', 'opponent_id', *GAME_TEAM_INTS,
+            'top_performer_id', 'result', 'biggest_scoring_run', 'times_leading_seconds',
+        ], rows)
+
+    def _plays(self, game_id, game, teams):
+        rows = []
+        for play in game['play_by_play']:
+            image = None if play.athlete_image == 'unknown' else play.athlete_image
+            rows.append((game_id, play.event, teams[play.team],
+                         self.player_id(play.athlete_name, teams[play.team], image=image),
+                         play.period, play.clock_seconds, play.description,
+                         play.team_score, play.opp_score))
+        self._replace('plays', game_id, [
+            'game_id', 'event', 'team_id', 'player_id', 'period', 'clock_seconds',
+            'description', 'team_score', 'opp_score',
+        ], rows)
+
+    def _boxscore(self, game_id, game, teams):
+        rows = []
+        for number, line in enumerate(game['boxscore']):
+            player_id = None
+            if not line.totals:
+                player_id = self.player_id(line.player_name, teams[line.team],
+                                           jersey_number=line.jersey_number)
+            rows.append((game_id, number, teams[line.team], player_id, int(line.totals),
+                         int(line.played), line.jersey_number,
+                         *[getattr(line, name) for name in STAT_FIELDS]))
+        self._replace('boxscore_lines', game_id, [
+            'game_id', 'line', 'team_id', 'player_id', 'totals', 'played',
+            'jersey_number', *STAT_FIELDS,
+        ], rows)
+
+    def write_game(self, game):
+        # games of a batch share one transaction, committed by flush(). A
+        # savepoint outside a transaction would be a transaction of its own
+        # and its release a commit
+        if not self.db.in_transaction:
+            self.db.execute("BEGIN")
+        # a game failing half way leaves the other games of the batch alone
+        self.db.execute("SAVEPOINT game")
+        try:
+            teams = dict(zip('AB', (self.team_id(name) for name in game['team_names'])))
+            game_id = self._upsert_game(game, teams)
+            self._game_teams(game_id, game)
+            self._plays(game_id, game, teams)
+            self._boxscore(game_id, game, teams)
+        except Exception:
+            self.db.execute("ROLLBACK TO game")
+            self.db.execute("RELEASE game")
+            # ids cached while writing the game may have been rolled back
+            self.team_ids.clear()
+            self.player_ids.clear()
+            raise
+        self.db.execute("RELEASE game")
+        self.pending += 1
+        self.games_written += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    # players of a roster (see RosterScrapper.parse_roster or PlayerTable.rows)
+    def write_players(self, players):
+        for player in players:
+            name = f"{player.get('first_name', '')} {player.get('last_name', '')}".strip()
+            self.player_id(name, self.team_id(player.get('team')),
+                           first_name=player.get('first_name'),
+                           last_name=player.get('last_name'), dob=player.get('dob'),
+                           jersey_number=player.get('jersey_number'),
+                           position=player.get('position'), height=player.get('height'),
+                           image=player.get('player_img'))
+        self.flush()
+
+    def flush(self):
+        self.db.commit()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
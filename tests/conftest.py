@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the modules live at the root of the repo
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURES_PATH = os.path.join(ROOT, 'fixtures')
@@ -0,0 +1,14 @@
+import pytest
+
+from benchmark import bench_memory
+from parsers import available_parsers
+
+
+# games of each of the two batches bench_memory compares
+GAMES = 10
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+def test_memory_is_flat_across_games(parser):
+    result = bench_memory(parser, GAMES)
+    assert result['flat'], result
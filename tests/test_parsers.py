@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES_PATH
+from parsers import available_parsers
+from scrapper import WebScrapper
+
+
+# game page the fixtures were saved from
+GAME_URL = 'https://www.fiba.basketball/afrobasket/2021/pre-qualifiers/game/1401/South-Sudan-Somalia'
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_PATH, name + '.html'), 'rb') as fh:
+        return fh.read()
+
+
+# games in brief and play by play of the saved game, read with `parser`
+def records(parser):
+    scrapper = WebScrapper(parser=parser)
+    scrapper.load(fixture('game'), GAME_URL)
+    play_by_play = scrapper.parser.parse(fixture('play_by_play'))
+    return {
+        'game_in_brief': scrapper.get_game_in_brief(
+            preview_tab=fixture('preview'), compare_tab=fixture('team_comparison')),
+        'play_by_play': [scrapper.get_game_play_by_play(soup=play_by_play, team=team)
+                         for team in 'AB'],
+    }
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+def test_backends_extract_the_same_records(parser):
+    assert records(parser) == records('html.parser')
+
+
+def test_records_are_read():
+    game = records('html.parser')
+    assert [row['team'] for row in game['game_in_brief']] == ['South Sudan', 'Somalia']
+    assert all(game['play_by_play'])
@@ -0,0 +1,224 @@
+"""
+    Name        : Crawl Worker
+    Date        : 18-10-2026
+    Description : Crawl games claimed from a shared work queue, and merge the outputs of every worker.
+"""
+
+
+import argparse
+import csv
+import os
+import time
+
+from archive import RawArchive
+from cache import ResponseCache
+from crawler import AsyncCrawler
+from instrumentation import get_logger, get_metrics, setup_logging
+from manifest import CrawlManifest, fingerprint
+from parsers import fastest_parser
+from paths import make_parent
+from pipeline import Pipeline
+from ratelimit import RateLimiter
+from scrapper import (BASE_URL, CACHE_DEFAULT_TTL, CACHE_TTL_RULES, OUTPUTS, absolute_url,
+                      close_writers, csv_outputs, flush_writers, open_writers, save_game, tabs_for)
+from session import create_session
+from workqueue import Heartbeat, open_queue, worker_name
+
+
+log = get_logger(__name__)
+
+# games claimed at a time, crawled by one run of the pipeline
+BATCH_SIZE = 50
+
+# seconds between claims while other workers still hold jobs
+POLL_INTERVAL = 5
+
+
+def enqueue(queue, filename):
+    """Queue the game urls of a games-links csv, returns how many were new."""
+    with open(filename, 'r') as f:
+        urls = [absolute_url(d['url']) for d in csv.DictReader(f)]
+    return queue.put(urls)
+
+
+def work(queue, worker, worker_path, outputs=None, concurrency=4, rate=2.0,
+         base_url=BASE_URL, batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL,
+         rss_budget=None):
+    """Crawl games claimed from `queue` into this worker's own folder.
+
+    Games are claimed `batch_size` at a time and the batch is crawled to
+    the end, a game of the batch that didn't come out of the pipeline is
+    failed back to the queue. Once the queue is drained the worker waits
+    for the jobs other workers hold, they come back if their lease runs
+    out.
+
+    Every output file of the worker is append-only. When a game's rows
+    are flushed, the byte range they take in each file is stored with the
+    job as it is completed, merge() copies exactly those ranges. Returns
+    the number of games completed.
+    """
+    outputs = outputs or OUTPUTS
+    data_path = os.path.join(worker_path, 'data')
+    metrics = get_metrics()
+
+    # rows of a game that was being written when this worker died are dropped
+    manifest = CrawlManifest(os.path.join(worker_path, 'manifest.sqlite'))
+    manifest.restore_outputs(csv_outputs(data_path).values())
+
+    cache = ResponseCache(os.path.join(worker_path, 'cache', 'responses.sqlite'),
+                          ttl_rules=CACHE_TTL_RULES, default_ttl=CACHE_DEFAULT_TTL)
+    session = create_session(pool_maxsize=concurrency,
+                             rate_limiter=RateLimiter(rate=rate, burst=concurrency),
+                             cache=cache)
+    archive = RawArchive(os.path.join(worker_path, 'raw', 'responses.warc'))
+    crawler = AsyncCrawler(session=session, concurrency=concurrency,
+                           tabs=tabs_for(outputs), base_url=base_url, archive=archive)
+    pipeline = Pipeline(crawler, parser=fastest_parser(), outputs=outputs,
+                        rss_budget=rss_budget)
+    writers = open_writers(data_path)
+
+    done = 0
+    sizes = flush_writers(writers)
+    log.info("worker started", worker=worker, **queue.summary())
+    try:
+        with Heartbeat(queue, worker):
+            while True:
+                jobs = queue.claim(worker, limit=batch_size)
+                if not jobs:
+                    if not queue.outstanding(exclude=worker):
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                claimed = {job.url for job in jobs}
+                for game in pipeline.run([job.url for job in jobs]):
+                    url = game['url']
+                    claimed.discard(url)
+                    if not all(game['tabs'].values()):
+                        missing = [tab for tab, ok in game['tabs'].items() if not ok]
+                        log.warning("missing tabs", url=url, tabs=missing)
+                        metrics.inc('games_failed_total')
+                        queue.fail(url, worker, error=f"missing tabs {','.join(missing)}")
+                        continue
+                    # retried later, dead-lettered as not final (see the
+                    # status and requeue-dead commands) if it still isn't
+                    if not game['final']:
+                        log.info("game not final", url=url)
+                        metrics.inc('games_not_final_total')
+                        queue.fail(url, worker, error='not final')
+                        continue
+
+                    save_game(game, writers)
+                    end = flush_writers(writers)
+                    manifest.complete(url, fingerprint(game), tabs=game['tabs'], outputs=end)
+                    ranges = {os.path.basename(filename): [sizes[filename], size]
+                              for filename, size in end.items()}
+                    sizes = end
+                    cache.pin(url)
+                    if queue.complete(url, worker, result={'ranges': ranges}):
+                        metrics.inc('games_total')
+                        done += 1
+                    else:
+                        # another worker took the job over, its rows are merged instead
+                        log.warning("lease lost", url=url, worker=worker)
+                        metrics.inc('leases_lost_total')
+
+                # games the crawler or the parsers dropped
+                for url in claimed:
+                    queue.fail(url, worker, error='not crawled')
+                    metrics.inc('games_failed_total')
+    finally:
+        close_writers(writers)
+        manifest.close()
+        archive.close()
+        cache.close()
+        # jobs claimed but not finished go straight back to the queue
+        queue.release(worker)
+
+    log.info("worker finished", worker=worker, games=done, **queue.summary())
+    return done
+
+
+def merge(queue, workers_path, data_path):
+    """Merge the csv outputs of every worker folder in `workers_path`.
+
+    Games are written in the order they were queued, each from the worker
+    that completed it, so the merged files don't depend on which worker
+    crawled what or when.
+    """
+    handles = {}
+    merged = {}
+    try:
+        for name, filename in csv_outputs(data_path).items():
+            make_parent(filename)
+            merged[name] = open(filename + '.part', 'wb')
+
+        header = {}
+        games = 0
+        for url, worker, result in queue.completed():
+            for name, out in merged.items():
+                basename = os.path.basename(csv_outputs(data_path)[name])
+                start, end = result['ranges'][basename]
+                key = (worker, basename)
+                if key not in handles:
+                    handles[key] = open(os.path.join(workers_path, worker, 'data', basename), 'rb')
+                fh = handles[key]
+                if name not in header:
+                    fh.seek(0)
+                    header[name] = fh.readline()
+                    out.write(header[name])
+                fh.seek(start)
+                out.write(fh.read(end - start))
+            games += 1
+    finally:
+        for fh in handles.values():
+            fh.close()
+        for out in merged.values():
+            out.close()
+
+    for name, filename in csv_outputs(data_path).items():
+        os.replace(filename + '.part', filename)
+    log.info("merged", games=games, workers=len({key[0] for key in handles}))
+    return games
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['enqueue', 'work', 'merge', 'status', 'requeue-dead'])
+    parser.add_argument('--queue', default="final/queue.sqlite",
+                        help="queue location, a path or sqlite:///path")
+    parser.add_argument('--links', default='games-links.csv',
+                        help="games-links csv to enqueue, repeat per competition")
+    parser.add_argument('--workers-path', default="final/workers/",
+                        help="folder holding one folder per worker, shared for merge")
+    parser.add_argument('--worker', default=None, help="worker name, host-pid by default")
+    parser.add_argument('--out', default="final/data/", help="folder of the merged outputs")
+    parser.add_argument('--outputs', default=','.join(OUTPUTS),
+                        help=f"comma separated, any of {','.join(OUTPUTS)}")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=2.0)
+    parser.add_argument('--rss-budget-mb', type=int, default=None,
+                        help="stop taking in games while over this much resident memory")
+    args = parser.parse_args()
+
+    setup_logging(os.environ.get('SCRAPPER_LOG_LEVEL', 'INFO'),
+                  json_lines=os.environ.get('SCRAPPER_LOG_JSON') == '1')
+
+    with open_queue(args.queue) as queue:
+        if args.command == 'enqueue':
+            log.info("enqueued", games=enqueue(queue, args.links), **queue.summary())
+        elif args.command == 'work':
+            worker = args.worker or worker_name()
+            worker_path = os.path.join(args.workers_path, worker)
+            work(queue, worker, worker_path, outputs=args.outputs.split(','),
+                 concurrency=args.concurrency, rate=args.rate,
+                 rss_budget=args.rss_budget_mb * 1024 * 1024 if args.rss_budget_mb else None)
+            get_metrics().write(os.path.join(worker_path, 'metrics.json'))
+        elif args.command == 'merge':
+            merge(queue, args.workers_path, args.out)
+        elif args.command == 'requeue-dead':
+            log.info("requeued", games=queue.requeue_dead())
+        else:
+            log.info("queue", **queue.summary())
+            for url, attempts, error in queue.dead_letters():
+                log.warning("dead letter", url=url, attempts=attempts, error=error)
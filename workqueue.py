@@ -0,0 +1,326 @@
+"""
+    Name        : Work Queue
+    Date        : 18-10-2026
+    Description : Shared queue of game urls claimed with leases by crawl workers on many machines.
+"""
+
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from instrumentation import get_logger
+from paths import make_parent
+
+
+log = get_logger(__name__)
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+DEAD = 'dead'
+
+# seconds a claimed job stays with its worker without a heartbeat
+LEASE = 120
+
+# attempts of a job before it is dead-lettered
+MAX_ATTEMPTS = 3
+
+# seconds before a failed job can be claimed again, doubled every attempt
+RETRY_DELAY = 30
+
+
+class Job:
+    """A game url claimed by a worker. `id` is the order it was queued in."""
+
+    def __init__(self, id, url, attempts, worker=None, lease_until=None):
+        self.id = id
+        self.url = url
+        self.attempts = attempts
+        self.worker = worker
+        self.lease_until = lease_until
+
+    def __repr__(self):
+        return f"Job({self.id}, {self.url!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    """Game urls shared by any number of crawl workers.
+
+    put() queues urls once, a url already in the queue (done or not) is
+    never queued again, so competitions sharing games don't fetch them
+    twice. claim() hands a worker jobs leased to it for `lease` seconds,
+    heartbeat() extends the leases of a worker still busy with them. A
+    job whose lease runs out goes back to the queue, each claim counts as
+    an attempt and a job failing `max_attempts` times is dead-lettered.
+    complete() stores the worker's result with the job, only while the job
+    is still leased to that worker.
+    """
+
+    def put(self, urls):
+        raise NotImplementedError
+
+    def claim(self, worker, limit=1, lease=None):
+        raise NotImplementedError
+
+    def heartbeat(self, worker, lease=None):
+        raise NotImplementedError
+
+    def complete(self, url, worker, result=None):
+        raise NotImplementedError
+
+    def fail(self, url, worker, error=None):
+        raise NotImplementedError
+
+    def release(self, worker):
+        raise NotImplementedError
+
+    def outstanding(self, exclude=None):
+        """Jobs pending or leased to a worker other than `exclude`."""
+        raise NotImplementedError
+
+    def completed(self):
+        """(url, worker, result) of the done jobs, in queue order."""
+        raise NotImplementedError
+
+    def dead_letters(self):
+        raise NotImplementedError
+
+    def requeue_dead(self):
+        raise NotImplementedError
+
+    def summary(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SqliteWorkQueue(WorkQueue):
+    """Work queue in a SQLite file in WAL mode, e.g on storage shared by the
+    workers. Claims run in an immediate transaction so two workers never
+    lease the same job.
+    """
+
+    def __init__(self, path, lease=LEASE, max_attempts=MAX_ATTEMPTS,
+                 retry_delay=RETRY_DELAY, timeout=60):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        make_parent(path)
+
+        # the heartbeat thread of a worker shares the connection
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                  check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                available_at REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                result TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at, id);
+        """)
+
+    # run fn(db) in one write transaction, taken before any read so the
+    # rows read can't be claimed by another worker in between
+    def _write(self, fn):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self.db)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            return result
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def put(self, urls):
+        now = time.time()
+
+        def put(db):
+            added = 0
+            for url in urls:
+                added += db.execute(
+                    "INSERT OR IGNORE INTO jobs (url, status, updated_at) VALUES (?, ?, ?)",
+                    (url, PENDING, now)).rowcount
+            return added
+        return self._write(put)
+
+    # leases that ran out, back to the queue or dead-lettered
+    def _expire(self, db, now):
+        db.execute("""
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                error = 'lease expired', worker = NULL, lease_until = NULL, updated_at = ?
+            WHERE status = ? AND lease_until < ?
+            """, (self.max_attempts, DEAD, PENDING, now, LEASED, now))
+
+    def claim(self, worker, limit=1, lease=None):
+        now = time.time()
+        lease_until = now + (lease or self.lease)
+
+        def claim(db):
+            self._expire(db, now)
+            rows = db.execute("""
+                SELECT id, url, attempts FROM jobs
+                WHERE status = ? AND available_at <= ? ORDER BY id LIMIT ?
+                """, (PENDING, now, limit)).fetchall()
+            db.executemany("""
+                UPDATE jobs SET status = ?, worker = ?, lease_until = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+                """, [(LEASED, worker, lease_until, now, row[0]) for row in rows])
+            return [Job(id, url, attempts + 1, worker, lease_until)
+                    for id, url, attempts in rows]
+        return self._write(claim)
+
+    # extend the leases of every job the worker holds, returns how many
+    def heartbeat(self, worker, lease=None):
+        now = time.time()
+        return self._write(lambda db: db.execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE status = ? AND worker = ?",
+            (now + (lease or self.lease), now, LEASED, worker)).rowcount)
+
+    # False when the job's lease was lost to another worker
+    def complete(self, url, worker, result=None):
+        now = time.time()
+        result = json.dumps(result) if result is not None else None
+        return self._write(lambda db: db.execute("""
+            UPDATE jobs SET status = ?, result = ?, error = NULL, lease_until = NULL,
+                updated_at = ?
+            WHERE url = ? AND worker = ? AND status = ?
+            """, (DONE, result, now, url, worker, LEASED)).rowcount == 1)
+
+    # retried after a delay, or dead-lettered after max_attempts
+    def fail(self, url, worker, error=None):
+        now = time.time()
+
+        def fail(db):
+            row = db.execute(
+                "SELECT attempts FROM jobs WHERE url = ? AND worker = ? AND status = ?",
+                (url, worker, LEASED)).fetchone()
+            if row is None:
+                return None
+            status = DEAD if row[0] >= self.max_attempts else PENDING
+            db.execute("""
+                UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_until = NULL,
+                    available_at = ?, updated_at = ?
+                WHERE url = ?
+                """, (status, str(error) if error is not None else None,
+                      now + self.retry_delay * 2 ** (row[0] - 1), now, url))
+            return status
+        return self._write(fail)
+
+    # give back the jobs of a worker that stops, without counting an attempt
+    def release(self, worker):
+        now = time.time()
+        return self._write(lambda db: db.execute("""
+            UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL,
+                attempts = MAX(attempts - 1, 0), updated_at = ?
+            WHERE status = ? AND worker = ?
+            """, (PENDING, now, LEASED, worker)).rowcount)
+
+    def outstanding(self, exclude=None):
+        return self._query("""
+            SELECT COUNT(*) FROM jobs
+            WHERE status = ? OR (status = ? AND worker IS NOT ?)
+            """, (PENDING, LEASED, exclude))[0][0]
+
+    def completed(self):
+        return [(url, worker, json.loads(result) if result else None)
+                for url, worker, result in self._query(
+                    "SELECT url, worker, result FROM jobs WHERE status = ? ORDER BY id",
+                    (DONE,))]
+
+    def dead_letters(self):
+        return self._query(
+            "SELECT url, attempts, error FROM jobs WHERE status = ? ORDER BY id", (DEAD,))
+
+    # dead jobs get max_attempts more, e.g once the site is back
+    def requeue_dead(self):
+        now = time.time()
+        return self._write(lambda db: db.execute(
+            "UPDATE jobs SET status = ?, attempts = 0, available_at = 0, updated_at = ? WHERE status = ?",
+            (PENDING, now, DEAD)).rowcount)
+
+    def summary(self):
+        return dict(self._query("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+    def close(self):
+        self.db.close()
+
+
+# queue backends by url scheme
+QUEUES = {
+    'sqlite': SqliteWorkQueue,
+}
+
+
+def open_queue(location, **options):
+    """Queue at `location`, 'sqlite:///shared/queue.sqlite' or a plain path."""
+    scheme, sep, path = location.partition('://')
+    if not sep:
+        scheme, path = 'sqlite', location
+    if scheme not in QUEUES:
+        raise ValueError(f"queue must be one of {list(QUEUES)}")
+    return QUEUES[scheme](path, **options)
+
+
+# name of this worker process, unique across machines
+def worker_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Heartbeat:
+    """Keeps the leases of a worker alive from a background thread."""
+
+    def __init__(self, queue, worker, interval=None):
+        self.queue = queue
+        self.worker = worker
+        self.interval = interval or getattr(queue, 'lease', LEASE) / 3
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.queue.heartbeat(self.worker)
+            except Exception as e:
+                # the next beat may get through before the leases run out
+                log.warning("heartbeat failed", worker=self.worker, error=e)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,97 @@
+"""
+    Name        : Output Writers
+    Date        : 18-10-2026
+    Description : Long lived, buffered writers with a fixed schema for the scrapped data.
+"""
+
+
+import csv
+import os
+
+from paths import make_parent
+
+
+# column holding the values of unexpected fields when extras='collect'
+EXTRA_FIELD = 'extra'
+
+
+class CsvWriter:
+    """Append rows to a csv file opened once for the whole crawl.
+
+    The columns are fixed by `fieldnames` up front. Missing fields are
+    written as `restval`, fields not in the schema are dropped
+    (extras='ignore'), raise ValueError (extras='raise') or are kept as
+    `key=value` pairs in an extra column (extras='collect'). Rows are
+    buffered and written `batch_size` at a time. Appending to an existing
+    file is only allowed when its header matches the schema.
+    """
+
+    def __init__(self, filename, fieldnames, extras='ignore', restval='', batch_size=500):
+        if extras not in ('ignore', 'raise', 'collect'):
+            raise ValueError("extras must be one of 'ignore', 'raise' or 'collect'")
+
+        self.filename = filename
+        self.fieldnames = list(fieldnames)
+        if extras == 'collect' and EXTRA_FIELD not in self.fieldnames:
+            self.fieldnames.append(EXTRA_FIELD)
+        self.extras = extras
+        self.restval = restval
+        self.batch_size = batch_size
+        self.buffer = []
+        self.rows_written = 0
+
+        make_parent(filename)
+
+        write_header = True
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            with open(filename, 'r', newline='') as fh:
+                header = next(csv.reader(fh), [])
+            if header != self.fieldnames:
+                raise ValueError(
+                    f"{filename} has columns {header}, expected {self.fieldnames}")
+            write_header = False
+
+        self.fh = open(filename, 'a', newline='')
+        self.writer = csv.writer(self.fh)
+        if write_header:
+            self.writer.writerow(self.fieldnames)
+
+    # the row as a list of values in schema order
+    def _to_list(self, row):
+        unknown = [key for key in row if key not in self.fieldnames]
+        values = dict(row)
+        if unknown:
+            if self.extras == 'raise':
+                raise ValueError(f"fields not in the schema: {unknown}")
+            if self.extras == 'collect':
+                values[EXTRA_FIELD] = ';'.join(
+                    f"{key}={row[key]}" for key in unknown)
+        return [values.get(field, self.restval) for field in self.fieldnames]
+
+    def write(self, row):
+        self.buffer.append(self._to_list(row))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        if self.buffer:
+            self.writer.writerows(self.buffer)
+            self.rows_written += len(self.buffer)
+            self.buffer = []
+        self.fh.flush()
+
+    def close(self):
+        if self.fh.closed:
+            return
+        self.flush()
+        self.fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()